@@ -13,4 +13,16 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'assistant.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from assistant.lifespan import lifespan_app  # noqa: E402  (requiere Django configurado)
+from assistant.websocket import websocket_app  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan_app(scope, receive, send)
+    elif scope["type"] == "websocket":
+        await websocket_app(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,60 @@
+"""
+Manejo del protocolo `lifespan` de ASGI.
+
+Django no implementa lifespan, así que aquí se crean los recursos
+compartidos del worker al arrancar y se liberan al apagar.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def startup() -> None:
+    import asyncio
+
+    from core.authentication.supabase_keys import supabase_key_store
+    from core.utils.http_client import get_http_client
+    from core.utils.memory_manager import memoria_manager
+    from core.utils.tokens import cargar_encoding
+
+    get_http_client()
+    memoria_manager.backend.start()
+    # Descarga inicial del JWKS fuera del event loop
+    await asyncio.to_thread(supabase_key_store.start)
+    # El tokenizador lee su archivo BPE; contar_tokens usa la heurística hasta entonces
+    await asyncio.to_thread(cargar_encoding)
+    logger.info("Worker ASGI iniciado")
+
+
+async def shutdown() -> None:
+    from core.utils.gemini_client import close_gemini_openai_client
+    from core.utils.http_client import close_http_client
+
+    from core.authentication.supabase_keys import supabase_key_store
+    from core.utils.memory_manager import memoria_manager
+
+    await close_http_client()
+    await close_gemini_openai_client()
+    supabase_key_store.stop()
+    memoria_manager.backend.stop()
+    logger.info("Worker ASGI detenido")
+
+
+async def lifespan_app(scope, receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await startup()
+            except Exception as e:
+                logger.error(f"Error en startup: {e}", exc_info=True)
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            try:
+                await shutdown()
+            except Exception as e:
+                logger.error(f"Error en shutdown: {e}", exc_info=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
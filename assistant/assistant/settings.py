@@ -67,6 +67,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'assistant.wsgi.application'
+ASGI_APPLICATION = 'assistant.asgi.application'
 
 
 # Database
@@ -165,8 +166,100 @@ SUPABASE_KEY = "super_secret_key"
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Desactivar verificación SSL para Gemini (útil detrás de proxy corporativo con cert autofirmado)
 GEMINI_DISABLE_SSL_VERIFY = os.getenv("GEMINI_DISABLE_SSL_VERIFY", "false").lower() in ("1", "true", "yes")
+# Timeout (segundos) de las llamadas directas a Gemini vía su API compatible con OpenAI
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "15"))
 API_UBE_URL = os.getenv("API_UBE_URL")
-
+# Cliente HTTP compartido hacia la API UBE (ver core/utils/http_client.py)
+API_UBE_HTTP2 = os.getenv("API_UBE_HTTP2", "true").lower() in ("1", "true", "yes")
+API_UBE_TIMEOUT = float(os.getenv("API_UBE_TIMEOUT", "10"))
+API_UBE_CONNECT_TIMEOUT = float(os.getenv("API_UBE_CONNECT_TIMEOUT", "5"))
+API_UBE_MAX_CONNECTIONS = int(os.getenv("API_UBE_MAX_CONNECTIONS", "50"))
+API_UBE_MAX_KEEPALIVE = int(os.getenv("API_UBE_MAX_KEEPALIVE", "20"))
+# Vigencia (segundos) de las cachés de la API de ventas
+DETALLE_CACHE_TTL = int(os.getenv("DETALLE_CACHE_TTL", str(6 * 3600)))
+MALLA_CACHE_TTL = int(os.getenv("MALLA_CACHE_TTL", str(24 * 3600)))
+GRUPOS_CACHE_TTL = int(os.getenv("GRUPOS_CACHE_TTL", "300"))
+# Catálogo de carreras: vigencia (segundos) y fracción aleatoria del TTL para adelantar la actualización
+CARRERAS_CACHE_TTL = int(os.getenv("CARRERAS_CACHE_TTL", "3600"))
+CARRERAS_REFRESH_JITTER = float(os.getenv("CARRERAS_REFRESH_JITTER", "0.1"))
+# Confianza mínima del clasificador local de intención; por debajo se consulta a Gemini
+INTENT_CLASSIFIER_THRESHOLD = float(os.getenv("INTENT_CLASSIFIER_THRESHOLD", "0.75"))
+# Caché de clasificaciones de Gemini por mensaje normalizado
+CLASSIFY_CACHE_SIZE = int(os.getenv("CLASSIFY_CACHE_SIZE", "2048"))
+CLASSIFY_CACHE_TTL = int(os.getenv("CLASSIFY_CACHE_TTL", "3600"))  # segundos
+
+
+# Caché de verificación de tokens (segundos); las entradas negativas son tokens rechazados
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_NEGATIVE_CACHE_TTL = int(os.getenv("AUTH_NEGATIVE_CACHE_TTL", "30"))
+
+# Verificación local de JWT de Supabase: JWKS del proyecto o secreto HS256 (proyectos legacy)
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+SUPABASE_JWKS_REFRESH = int(os.getenv("SUPABASE_JWKS_REFRESH", "3600"))  # segundos
+
+# Paginación del historial de chats (page_size por defecto y máximo)
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "20"))
+CHAT_HISTORY_MAX_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_MAX_PAGE_SIZE", "100"))
+# Paginación de los mensajes de un chat
+CHAT_MESSAGES_PAGE_SIZE = int(os.getenv("CHAT_MESSAGES_PAGE_SIZE", "50"))
+CHAT_MESSAGES_MAX_PAGE_SIZE = int(os.getenv("CHAT_MESSAGES_MAX_PAGE_SIZE", "200"))
+
+# Memoria de conversación: "local" (por proceso) o "cache" (alias de CACHES, compartida entre workers)
+CHAT_MEMORY_BACKEND = os.getenv("CHAT_MEMORY_BACKEND", "local")
+CHAT_MEMORY_CACHE_ALIAS = os.getenv("CHAT_MEMORY_CACHE_ALIAS", "chat_memory")
+# Mensajes que ve cada agente (y que se rehidratan desde ChatHistory si la memoria no está);
+# CHAT_MEMORY_WINDOWS ajusta la ventana por agente, p. ej. "ventas:30,faq:10"
+CHAT_MEMORY_WINDOW = int(os.getenv("CHAT_MEMORY_WINDOW", "20"))
+CHAT_MEMORY_WINDOWS = {
+    nombre.strip(): int(ventana)
+    for nombre, ventana in (
+        par.split(":") for par in os.getenv("CHAT_MEMORY_WINDOWS", "ventas:30,faq:10,soporte_ti:10,public:10").split(",") if par.strip()
+    )
+}
+CHAT_MEMORY_MAX_MESSAGES = int(os.getenv("CHAT_MEMORY_MAX_MESSAGES", "100"))
+# Chats en la memoria local de cada worker; con la tabla de caché compartida, chats
+# activos esperados entre todos los workers y fracción (1/N) que se elimina al llenarse
+CHAT_MEMORY_MAX_CHATS = int(os.getenv("CHAT_MEMORY_MAX_CHATS", "500"))
+CHAT_MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_MEMORY_CACHE_MAX_ENTRIES", "10000"))
+CHAT_MEMORY_CACHE_CULL_FREQUENCY = int(os.getenv("CHAT_MEMORY_CACHE_CULL_FREQUENCY", "10"))
+# Cada cuántos segundos se eliminan las memorias locales vencidas
+CHAT_MEMORY_SWEEP_INTERVAL = int(os.getenv("CHAT_MEMORY_SWEEP_INTERVAL", "60"))
+# Presupuesto de bytes de la memoria local entre todos los chats del worker y tamaño
+# (bytes) a partir del cual un mensaje se guarda comprimido con zlib
+CHAT_MEMORY_MAX_BYTES = int(os.getenv("CHAT_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+CHAT_MEMORY_COMPRESS_THRESHOLD = int(os.getenv("CHAT_MEMORY_COMPRESS_THRESHOLD", "512"))
+# "summary": el agente ve los mensajes recientes que caben en CHAT_MEMORY_TOKEN_BUDGET
+# y los anteriores se condensan en un resumen en segundo plano; "buffer": solo la ventana
+CHAT_MEMORY_MODE = os.getenv("CHAT_MEMORY_MODE", "buffer")
+CHAT_MEMORY_TOKEN_BUDGET = int(os.getenv("CHAT_MEMORY_TOKEN_BUDGET", "2000"))
+
+# Métricas: /metrics exige "Authorization: Bearer <METRICS_TOKEN>"; sin token
+# responde 404 salvo que METRICS_PUBLIC lo exponga explícitamente sin autenticación
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() in ("1", "true", "yes")
+
+# Con REDIS_URL la memoria compartida usa Redis; si no, una tabla de la base de datos
+# (se crea con `python manage.py createcachetable`, incluido en el Procfile)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "chat_memory": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    } if os.getenv("REDIS_URL") else {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "chat_memory_cache",
+        # Los valores por defecto (300 entradas, se borra 1/3 al llenarse) descartarían
+        # memorias de chats activos
+        "OPTIONS": {
+            "MAX_ENTRIES": CHAT_MEMORY_CACHE_MAX_ENTRIES,
+            "CULL_FREQUENCY": CHAT_MEMORY_CACHE_CULL_FREQUENCY,
+        },
+    },
+}
 
 # REST_FRAMEWORK = {
 #     "DEFAULT_AUTHENTICATION_CLASSES": [
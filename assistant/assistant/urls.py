@@ -3,8 +3,10 @@ from django.urls import path
 
 from core.views.chat_cleanup import ChatCleanupView
 from core.views.chat_history import ChatHistoryView
+from core.views.chat_messages import ChatMessagesView
 from core.views.profile import ProfileView
-from core.views.chat import ChatView
+from core.views.chat import ChatStreamView, ChatView
+from core.views.metrics import MetricsView
 from core.views import HomeView
 from assistant.schema_views import schema_json, SwaggerUIView, ReDocUIView
 
@@ -13,8 +15,11 @@ urlpatterns = [
     path("admin/", admin.site.urls, name="admin"),
     path("profile/", ProfileView.as_view(), name="profile"),
     path("chat/", ChatView.as_view(), name="chatbot"),
+    path("chat/stream/", ChatStreamView.as_view(), name="chatbot-stream"),
     path("chat/history/", ChatHistoryView.as_view(), name="chats-history"),
+    path("chat/<int:chat_id>/messages/", ChatMessagesView.as_view(), name="chat-messages"),
     path("chat/<int:chat_id>/cleanup/", ChatCleanupView.as_view(), name="chat-cleanup"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
     # Documentación pública (vistas Django puras, sin DRF → no piden login en producción)
     path("swagger.json", schema_json, name="schema-json"),
     path("swagger/", SwaggerUIView.as_view(), name="schema-swagger-ui"),
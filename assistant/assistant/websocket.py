@@ -0,0 +1,184 @@
+"""
+Endpoint WebSocket de chat (`/ws/chat/`), servido directamente desde el
+callable ASGI (sin Channels).
+
+Protocolo (frames de texto JSON):
+
+1. Cliente: {"type": "auth", "token": ..., "provider": ..., "chat_id": opcional}
+   Servidor: {"type": "ready", "chat_id": ...}
+2. Cliente: {"type": "message", "message": ...}
+   Servidor: los mismos eventos que `/chat/stream/` ({"type": "category"},
+   "tool_start", "tool_end", "token") y al final "done" o "error" con `chat_id`.
+
+La autenticación, el proveedor y el chat se resuelven una vez por conexión;
+cada mensaje solo vuelve a validar el token contra la caché de verificación.
+Se guardan el token recibido (para revalidarlo) y el `auth` que retorna el
+autenticador (lo que reciben las tools, p. ej. "Bearer <token>" para UBE).
+"""
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.agents.classifier import stream_message
+from core.authentication.backend_auth import AsyncBackendTokenAuthentication
+from core.models import Chat, Provider
+from core.services.chat_service import apersist_turn, obtener_chat
+
+logger = logging.getLogger(__name__)
+
+WS_CHAT_PATH = "/ws/chat/"
+
+# Códigos de cierre (rango 4000-4999 reservado para la aplicación)
+CIERRE_NORMAL = 1000
+CIERRE_NO_AUTENTICADO = 4401
+CIERRE_NO_ENCONTRADO = 4404
+
+authenticator = AsyncBackendTokenAuthentication()
+
+
+class ChatSocket:
+    """Estado de una conexión: usuario, token, chat y proveedor enlazados"""
+
+    def __init__(self, send):
+        self.send = send
+        self.user = None
+        self.token = None
+        self.auth = None
+        self.chat = None
+        self.provider = None
+        self.tarea: asyncio.Task | None = None
+        self.cerrado = False
+
+    async def enviar(self, datos: dict) -> None:
+        if not self.cerrado:
+            await self.send({"type": "websocket.send", "text": json.dumps(datos, ensure_ascii=False, default=str)})
+
+    async def cerrar(self, code: int = CIERRE_NORMAL) -> None:
+        if not self.cerrado:
+            self.cerrado = True
+            await self.send({"type": "websocket.close", "code": code})
+
+    async def run(self, receive) -> None:
+        try:
+            while not self.cerrado:
+                evento = await receive()
+                if evento["type"] == "websocket.disconnect":
+                    self.cerrado = True
+                    return
+                if evento["type"] != "websocket.receive":
+                    continue
+
+                try:
+                    datos = json.loads(evento.get("text") or evento.get("bytes") or "")
+                except ValueError:
+                    datos = None
+                if not isinstance(datos, dict):
+                    await self.enviar({"type": "error", "detail": "Se esperaba un objeto JSON"})
+                    continue
+
+                tipo = datos.get("type")
+                if self.user is None:
+                    await self.autenticar(datos)
+                elif tipo == "message":
+                    if self.tarea and not self.tarea.done():
+                        await self.enviar({"type": "error", "detail": "Hay una respuesta en curso"})
+                        continue
+                    self.tarea = asyncio.create_task(self.responder(datos.get("message")))
+                else:
+                    await self.enviar({"type": "error", "detail": f"Tipo de mensaje no soportado: {tipo}"})
+        finally:
+            if self.tarea and not self.tarea.done():
+                self.tarea.cancel()
+
+    async def autenticar(self, datos: dict) -> None:
+        if datos.get("type") != "auth":
+            await self.enviar({"type": "error", "detail": "El primer mensaje debe ser de tipo auth"})
+            await self.cerrar(CIERRE_NO_AUTENTICADO)
+            return
+
+        token = (datos.get("token") or "").replace("Bearer ", "").strip()
+        try:
+            user, auth = await authenticator.authenticate_token(token)
+        except AuthenticationFailed as e:
+            await self.enviar({"type": "error", "detail": str(e.detail)})
+            await self.cerrar(CIERRE_NO_AUTENTICADO)
+            return
+
+        chat_id = datos.get("chat_id")
+        if chat_id is not None:
+            try:
+                chat_id = int(chat_id)
+            except (TypeError, ValueError):
+                await self.enviar({"type": "error", "detail": "chat_id inválido"})
+                await self.cerrar(CIERRE_NO_ENCONTRADO)
+                return
+
+        try:
+            chat, provider = await obtener_chat(user, datos.get("provider"), chat_id)
+        except (Provider.DoesNotExist, Chat.DoesNotExist):
+            # Un chat ajeno se trata como inexistente
+            await self.enviar({"type": "error", "detail": "Proveedor o chat no encontrado"})
+            await self.cerrar(CIERRE_NO_ENCONTRADO)
+            return
+
+        self.user, self.token, self.auth = user, token, auth
+        self.chat, self.provider = chat, provider
+        logger.info(f"WebSocket autenticado | usuario: {user.username} | chat_id: {chat.id}")
+        await self.enviar({"type": "ready", "chat_id": chat.id})
+
+    async def responder(self, message: str | None) -> None:
+        if not message:
+            await self.enviar({"type": "error", "detail": "Mensaje vacío"})
+            return
+
+        try:
+            # Acierto de caché en el caso normal; detecta tokens vencidos o revocados
+            await authenticator.authenticate_token(self.token)
+        except AuthenticationFailed as e:
+            await self.enviar({"type": "error", "detail": str(e.detail)})
+            await self.cerrar(CIERRE_NO_AUTENTICADO)
+            return
+
+        guardado = False
+        try:
+            async for evento, datos in stream_message(
+                chat_id=self.chat.id,
+                user_message=message,
+                token=self.auth,
+                provider=self.provider
+            ):
+                if evento in ("done", "error"):
+                    guardado = True
+                    await apersist_turn(self.chat, message, datos["respuesta"])
+                    datos = {**datos, "chat_id": self.chat.id}
+                await self.enviar({"type": evento, **datos})
+        except Exception as e:
+            logger.error(f"Error en WebSocket | chat_id: {self.chat.id}: {e}", exc_info=True)
+            await self.enviar({"type": "error", "detail": "Ocurrió un error. Intenta de nuevo.", "chat_id": self.chat.id})
+        finally:
+            # Excepción del agente o conexión cerrada (tarea cancelada) antes del final
+            if not guardado:
+                await apersist_turn(self.chat, message, None)
+
+
+async def websocket_app(scope, receive, send) -> None:
+    evento = await receive()
+    if evento["type"] != "websocket.connect":
+        return
+
+    if scope["path"] != WS_CHAT_PATH:
+        # Cerrar antes de aceptar rechaza el handshake (HTTP 403)
+        await send({"type": "websocket.close", "code": CIERRE_NO_ENCONTRADO})
+        return
+
+    await send({"type": "websocket.accept"})
+    await sync_to_async(close_old_connections)()
+    socket = ChatSocket(send)
+    try:
+        await socket.run(receive)
+    finally:
+        await sync_to_async(close_old_connections)()
@@ -1,12 +1,8 @@
 from langchain_core.tools import tool
-from langchain_classic.agents import AgentExecutor, create_openai_functions_agent
-from langchain_classic import hub
-from langchain_google_genai import ChatGoogleGenerativeAI
-from assistant.settings import GEMINI_API_KEY
 import logging
 
-from core.utils.gemini_client import get_gemini_client_args
-from core.utils.memory_manager import memoria_manager
+from core.agents.prompts import prompt_registry
+from core.agents.registry import agent_registry
 
 logger = logging.getLogger(__name__)
 
@@ -32,39 +28,19 @@ async def default_tool() -> str:
         "- 🌐 Página oficial: https://ube.edu.ec/"
     )
 
-def get_chat_agent(chat_id: int):
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        google_api_key=GEMINI_API_KEY,
-        temperature=0.1,
-        client_args=get_gemini_client_args(),
-    )
-
-    system_prompt_template = f"""
-        Eres un asistente virtual de la Universidad Bolivariana del Ecuador (UBE).
-        Tu propósitos sonÑ
-        - Saludar
-        - Chat de forma libre solo con temas relacionados a la universidad Bolivariana
-        
-        TONO: Amigable, de apoyo y servicial.
-    """
+tools = [
+    default_tool,
+]
 
-    tools = [
-        default_tool,
-    ]
+system_prompt_template = """
+    Eres un asistente virtual de la Universidad Bolivariana del Ecuador (UBE).
+    Tu propósitos sonÑ
+    - Saludar
+    - Chat de forma libre solo con temas relacionados a la universidad Bolivariana
+    
+    TONO: Amigable, de apoyo y servicial.
+"""
+prompt_registry.register("chat", system_prompt_template)
 
-    prompt = hub.pull("hwchase17/openai-functions-agent")
-    prompt.messages[0].prompt.template = system_prompt_template
-    agent = create_openai_functions_agent(llm, tools, prompt)
-
-    memory = memoria_manager.get_memory(chat_id)
-
-    agent_executor = AgentExecutor(
-        agent=agent,
-        tools=tools,
-        verbose=True,
-        memory=memory,
-        max_iterations=5,
-        handle_parsing_errors=True
-    )
-    return agent_executor
+def get_chat_agent(chat_id: int):
+    return agent_registry.get_executor("chat", tools, chat_id)
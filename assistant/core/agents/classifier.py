@@ -4,20 +4,54 @@ from assistant.settings import UBE_PROVIDER_ID
 from core.utils.gemini_client import get_gemini_client_args
 from core.agents.chat_agent import get_chat_agent
 from core.agents.faq_agent import get_faq_agent
+from core.agents.intent_classifier import intent_classifier
 from core.agents.public_agent import get_public_agent
 from core.agents.soporte_ti__agent import get_soporte_ti_agent
 from core.agents.ventas_agent import get_ventas_agent
 from core.models import Provider
 from core.utils.memory_manager import memoria_manager
+from core.utils.metrics import chat_category_total, chat_stage_seconds, medir, metrics_callback
+from core.utils.text_utils import normalizar_texto
+from core.utils.ttl_cache import TTLCache
+from django.conf import settings
+from typing import AsyncIterator
 import logging
+import time
 
 
 logger = logging.getLogger(__name__)
 
+CATEGORIAS = {"ventas", "faq", "soporte_ti", "public"}
+
+
+def etiqueta_categoria(category: str) -> str:
+    """Etiqueta acotada para métricas: la salida de Gemini puede ser cualquier texto"""
+    return category if category in CATEGORIAS else "other"
+
+# Compartida por todas las peticiones del worker; clave = mensaje normalizado
+classification_cache = TTLCache(
+    maxsize=getattr(settings, "CLASSIFY_CACHE_SIZE", 2048),
+    ttl=getattr(settings, "CLASSIFY_CACHE_TTL", 3600),
+)
+
 async def classify_query(user_message: str) -> str:
-    """Clasifica la pregunta usando Gemini"""
+    """
+    Clasifica la pregunta. Los casos claros se resuelven con el clasificador
+    local; los de baja confianza se consultan en caché y, si no están, a Gemini.
+    """
     from assistant.settings import GEMINI_API_KEY
 
+    category, confianza = intent_classifier.classify(user_message)
+    if category:
+        logger.info(f"Categoría local: {category} (confianza {confianza:.2f})")
+        return category
+
+    cache_key = normalizar_texto(user_message)
+    category = classification_cache.get(cache_key)
+    if category:
+        logger.info(f"Categoría en caché: {category}")
+        return category
+
     llm = ChatGoogleGenerativeAI(
         model="gemini-2.0-flash",
         google_api_key=GEMINI_API_KEY,
@@ -42,8 +76,44 @@ async def classify_query(user_message: str) -> str:
     response = await llm.ainvoke(prompt)
     category = response.content.strip().lower()
     print(f"CATEGORIA: {category}")
+    if category in CATEGORIAS:
+        classification_cache.set(cache_key, category)
     return category
 
+def get_agent(category: str, chat_id: int, token: str, provider: Provider):
+    """Retorna el agente de la categoría según el proveedor; por defecto el de chat"""
+    if provider.id == UBE_PROVIDER_ID:
+        agent_map = {
+            "faq": lambda: get_faq_agent(chat_id),
+            "soporte_ti": lambda: get_soporte_ti_agent(chat_id, token),
+            "public": lambda: get_public_agent(chat_id),
+            "ventas": lambda: get_ventas_agent(chat_id),
+        }
+    else:
+        agent_map = {
+            "ventas": lambda: get_ventas_agent(chat_id),
+            "public": lambda: get_public_agent(chat_id),
+        }
+
+    return agent_map.get(category, lambda: get_chat_agent(chat_id))()
+
+
+def mensaje_error(e: Exception) -> str | None:
+    """Mensaje para el usuario ante un error del agente; None si debe propagarse"""
+    if isinstance(e, RuntimeError):
+        if "shutdown" in str(e).lower() or "cannot schedule new futures" in str(e):
+            logger.warning(f"Servidor recargado durante la petición: {e}")
+            return "El servidor se reinició. Por favor envía el mensaje de nuevo."
+        return None
+
+    err_msg = str(e).lower()
+    if "429" in err_msg or "quota" in err_msg or "resource_exhausted" in err_msg:
+        logger.warning(f"Cuota Gemini agotada: {e}")
+        return "Límite de uso de la IA alcanzado. Espera unos minutos o revisa tu plan en Google AI Studio."
+    logger.error(f"Error en route_message: {e}", exc_info=True)
+    return "Ocurrió un error. Intenta de nuevo."
+
+
 async def route_message(
     chat_id: int,
     user_message: str,
@@ -53,24 +123,15 @@ async def route_message(
     """Enruta el mensaje al agente correcto manteniendo contexto"""
 
     try:
-        category = await classify_query(user_message)
+        with medir("classify"):
+            category = await classify_query(user_message)
+        chat_category_total.inc(etiqueta_categoria(category))
         print(provider.id)
 
-        if provider.id == UBE_PROVIDER_ID:
-            agent_map = {
-                "faq": lambda: get_faq_agent(chat_id),
-                "soporte_ti": lambda: get_soporte_ti_agent(chat_id, token),
-                "public": lambda: get_public_agent(chat_id),
-                "ventas": lambda: get_ventas_agent(chat_id),
-            }
-        else:
-            agent_map = {
-                "ventas": lambda: get_ventas_agent(chat_id),
-                "public": lambda: get_public_agent(chat_id),
-            }
-
-        agent = agent_map.get(category, lambda: get_chat_agent(chat_id))()
-        response = await agent.ainvoke({"input": user_message})
+        with medir("agent_build"):
+            agent = get_agent(category, chat_id, token, provider)
+        with medir("agent_run"):
+            response = await agent.ainvoke({"input": user_message}, config={"callbacks": [metrics_callback]})
 
         logger.info(f"Invocando agente | Contexto existente: {memoria_manager.get_size()} chats")
 
@@ -79,15 +140,73 @@ async def route_message(
 
         return category, ai_response
 
-    except RuntimeError as e:
-        if "shutdown" in str(e).lower() or "cannot schedule new futures" in str(e):
-            logger.warning(f"Servidor recargado durante la petición: {e}")
-            return "error", "El servidor se reinició. Por favor envía el mensaje de nuevo."
-        raise
     except Exception as e:
-        err_msg = str(e).lower()
-        if "429" in err_msg or "quota" in err_msg or "resource_exhausted" in err_msg:
-            logger.warning(f"Cuota Gemini agotada: {e}")
-            return "error", "Límite de uso de la IA alcanzado. Espera unos minutos o revisa tu plan en Google AI Studio."
-        logger.error(f"Error en route_message: {e}", exc_info=True)
-        return "error", "Ocurrió un error. Intenta de nuevo."
\ No newline at end of file
+        mensaje = mensaje_error(e)
+        if mensaje is None:
+            raise
+        return "error", mensaje
+
+
+async def stream_message(
+    chat_id: int,
+    user_message: str,
+    token: str,
+    provider: Provider
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Variante en streaming de `route_message`. Genera tuplas (evento, datos):
+    `category`, `tool_start` / `tool_end`, `token` con cada fragmento del
+    texto generado y, al final, `done` (o `error`) con la respuesta completa.
+    """
+    try:
+        with medir("classify"):
+            category = await classify_query(user_message)
+        chat_category_total.inc(etiqueta_categoria(category))
+        yield "category", {"category": category}
+
+        with medir("agent_build"):
+            agent = get_agent(category, chat_id, token, provider)
+        ai_response = None
+        inicio = time.perf_counter()
+
+        # El iterador de AgentExecutor carga y guarda la memoria con los métodos
+        # síncronos, que en un chat frío consultan ChatHistory desde el event
+        # loop; la memoria se maneja aquí con sus variantes asíncronas
+        memory, agent.memory = agent.memory, None
+        inputs = {"input": user_message}
+        if memory is not None:
+            inputs.update(await memory.aload_memory_variables(inputs))
+
+        async for event in agent.astream_events(
+            inputs,
+            config={"callbacks": [metrics_callback]},
+            version="v2"
+        ):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if content and isinstance(content, str):
+                    yield "token", {"delta": content}
+            elif kind == "on_tool_start":
+                yield "tool_start", {"tool": event["name"], "input": event["data"].get("input")}
+            elif kind == "on_tool_end":
+                yield "tool_end", {"tool": event["name"]}
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # Fin del AgentExecutor (evento raíz)
+                output = event["data"].get("output") or {}
+                ai_response = output.get("output") if isinstance(output, dict) else None
+
+        chat_stage_seconds.observe(time.perf_counter() - inicio, "agent_run")
+        if memory is not None and ai_response:
+            await memory.asave_context({"input": user_message}, {"output": ai_response})
+        logger.info(f"Respuesta en streaming generada | chat_id: {chat_id}")
+        yield "done", {
+            "category": category,
+            "respuesta": ai_response or "Ocurrió un error procesando tu solicitud.",
+        }
+
+    except Exception as e:
+        mensaje = mensaje_error(e)
+        if mensaje is None:
+            raise
+        yield "error", {"category": "error", "respuesta": mensaje}
@@ -1,12 +1,8 @@
 from langchain_core.tools import tool
-from langchain_classic.agents import AgentExecutor, create_openai_functions_agent
-from langchain_classic import hub
-from langchain_google_genai import ChatGoogleGenerativeAI
-from assistant.settings import GEMINI_API_KEY
 import logging
 
-from core.utils.gemini_client import get_gemini_client_args
-from core.utils.memory_manager import memoria_manager
+from core.agents.prompts import prompt_registry
+from core.agents.registry import agent_registry
 
 logger = logging.getLogger(__name__)
 
@@ -22,43 +18,23 @@ async def informacion_biblioteca() -> str:
     - **Reserva de Material:** Puedes reservar libros físicos y salas de estudio desde el portal web de la Biblioteca, en la sección 'Catálogo'.
     """
 
-# ==================== AGENTE FACTORY PARA FAQ ====================
-def get_faq_agent(chat_id: int):
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        google_api_key=GEMINI_API_KEY,
-        temperature=0.1,
-        client_args=get_gemini_client_args(),
-    )
-
-    system_prompt_template = f"""
-        Eres "Agente FAQ", un asistente virtual de soporte académico y administrativo de la Universidad Bolivariana del Ecuador (UBE).
-        Tu único propósito es ayudar a los ALUMNOS que ya están matriculados con sus consultas diarias.
-
-        INSTRUCCIONES:
-        1. Tu tono debe ser de apoyo, amable y servicial.
-        3. Utiliza tus herramientas para responder preguntas sobre: horarios, notas, trámites, servicios de la universidad (biblioteca) y **soporte técnico (recuperación de credenciales, correo institucional)**.
-        4. Si la pregunta es sobre carreras, mallas curriculares, precios de matrícula inicial o procesos de admisión, responde amablemente que esa es una pregunta para el **Agente Dr. Matrícula (Ventas)**.
+tools = [
+    informacion_biblioteca,
+]
 
-        TONO: Amigable, de apoyo y servicial.
-    """
-
-    tools = [
-        informacion_biblioteca,
-    ]
+system_prompt_template = """
+    Eres "Agente FAQ", un asistente virtual de soporte académico y administrativo de la Universidad Bolivariana del Ecuador (UBE).
+    Tu único propósito es ayudar a los ALUMNOS que ya están matriculados con sus consultas diarias.
 
-    prompt = hub.pull("hwchase17/openai-functions-agent")
-    prompt.messages[0].prompt.template = system_prompt_template
-    agent = create_openai_functions_agent(llm, tools, prompt)
+    INSTRUCCIONES:
+    1. Tu tono debe ser de apoyo, amable y servicial.
+    3. Utiliza tus herramientas para responder preguntas sobre: horarios, notas, trámites, servicios de la universidad (biblioteca) y **soporte técnico (recuperación de credenciales, correo institucional)**.
+    4. Si la pregunta es sobre carreras, mallas curriculares, precios de matrícula inicial o procesos de admisión, responde amablemente que esa es una pregunta para el **Agente Dr. Matrícula (Ventas)**.
 
-    memory = memoria_manager.get_memory(chat_id)
+    TONO: Amigable, de apoyo y servicial.
+"""
+prompt_registry.register("faq", system_prompt_template)
 
-    agent_executor = AgentExecutor(
-        agent=agent,
-        tools=tools,
-        verbose=True,
-        memory=memory,
-        max_iterations=5,
-        handle_parsing_errors=True
-    )
-    return agent_executor
+# ==================== AGENTE FACTORY PARA FAQ ====================
+def get_faq_agent(chat_id: int):
+    return agent_registry.get_executor("faq", tools, chat_id)
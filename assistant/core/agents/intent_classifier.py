@@ -0,0 +1,131 @@
+"""
+Clasificador de intención local (sin LLM).
+
+Puntúa el mensaje normalizado contra términos (1 a 3 palabras) de cada
+categoría. Si la confianza supera el umbral configurado responde en el
+momento; en caso contrario `classify_query` recurre a Gemini.
+"""
+from threading import Lock
+import logging
+
+from core.utils.text_utils import normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+# Términos ya normalizados (minúsculas, sin acentos, conservando la ñ) con su peso por categoría
+TERMINOS_POR_CATEGORIA = {
+    "ventas": {
+        "carrera": 2, "carreras": 2, "licenciatura": 2, "ingenieria": 1.5,
+        "maestria": 2, "maestrias": 2, "postgrado": 2, "posgrado": 2, "pregrado": 2,
+        "malla": 3, "mallas": 3, "malla curricular": 3, "pensum": 3, "asignaturas": 2, "materias": 2,
+        "matricula": 2, "matricularme": 3, "matricular": 3, "inscripcion": 2, "inscribirme": 3,
+        "grupo": 2, "grupos": 2, "grupos disponibles": 3, "cupos": 2,
+        "requisitos": 1.5, "requisitos de ingreso": 3,
+        "precio": 2, "precios": 2, "costo": 2, "costos": 2, "cuanto cuesta": 3,
+        "modalidad": 1, "modalidades": 1, "estudiar": 1,
+    },
+    "faq": {
+        "biblioteca": 3, "libros": 2, "reservar libros": 3, "bases de datos": 2,
+        "horario": 1.5, "horarios": 1.5, "notas": 1.5, "tramites": 1.5,
+    },
+    "soporte_ti": {
+        "contraseña": 3, "clave": 2, "olvide mi contraseña": 3, "recuperar": 1.5,
+        "credenciales": 2, "credenciales sga": 3, "usuario sga": 3,
+        "correo institucional": 2, "email": 1, "correo": 1,
+    },
+    "public": {
+        "beneficios": 3, "quienes son": 3, "quienes somos": 3, "que es la ube": 3,
+        "mision": 3, "vision": 3, "becas": 3, "beca": 3,
+        "ayuda financiera": 3, "ayuda economica": 3, "ayudas economicas": 3,
+        "contacto": 2, "contactos": 2, "telefono": 1.5, "whatsapp": 1.5,
+        "pagina web": 3, "link": 1.5, "enlace": 1.5, "plataforma virtual": 3, "link sga": 3,
+    },
+}
+
+# Puntaje a partir del cual la categoría ganadora se considera "fuerte"
+PUNTAJE_SATURACION = 2.0
+MAX_NGRAMA = 3
+
+
+def _ngramas(tokens: list[str]) -> list[str]:
+    return [
+        " ".join(tokens[i:i + n])
+        for n in range(1, MAX_NGRAMA + 1)
+        for i in range(len(tokens) - n + 1)
+    ]
+
+
+class IntentClassifier:
+    """Clasificador por términos ponderados con contadores de aciertos y fallbacks"""
+
+    def __init__(self, terminos: dict, threshold: float = 0.75):
+        self.terminos = terminos
+        self.threshold = threshold
+        self._lock = Lock()
+        self._total = 0
+        self._hits = 0
+        self._fallbacks = 0
+
+    def score(self, user_message: str) -> dict[str, float]:
+        """Retorna el puntaje de cada categoría para el mensaje"""
+        ngramas = _ngramas(normalizar_texto(user_message).split())
+        puntajes = {}
+        for categoria, terminos in self.terminos.items():
+            puntaje = sum(terminos[ngrama] for ngrama in ngramas if ngrama in terminos)
+            if puntaje:
+                puntajes[categoria] = puntaje
+        return puntajes
+
+    def classify(self, user_message: str) -> tuple[str | None, float]:
+        """
+        Retorna (categoría, confianza).
+        La categoría es None cuando la confianza no alcanza el umbral.
+        """
+        ranking = sorted(self.score(user_message).items(), key=lambda x: x[1], reverse=True)
+        categoria = None
+        confianza = 0.0
+
+        if ranking:
+            mejor = ranking[0][1]
+            segundo = ranking[1][1] if len(ranking) > 1 else 0.0
+            margen = mejor / (mejor + segundo)
+            fuerza = min(1.0, mejor / PUNTAJE_SATURACION)
+            confianza = margen * fuerza
+            if confianza >= self.threshold:
+                categoria = ranking[0][0]
+
+        with self._lock:
+            self._total += 1
+            if categoria:
+                self._hits += 1
+            else:
+                self._fallbacks += 1
+
+        return categoria, confianza
+
+    def get_stats(self) -> dict:
+        """Contadores de clasificaciones resueltas localmente y enviadas al LLM"""
+        with self._lock:
+            total = self._total
+            return {
+                "total": total,
+                "hits": self._hits,
+                "fallbacks": self._fallbacks,
+                "hit_rate": self._hits / total if total else 0.0,
+                "fallback_rate": self._fallbacks / total if total else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._total = self._hits = self._fallbacks = 0
+
+
+def _crear_classifier() -> IntentClassifier:
+    from django.conf import settings
+    return IntentClassifier(
+        TERMINOS_POR_CATEGORIA,
+        threshold=getattr(settings, "INTENT_CLASSIFIER_THRESHOLD", 0.75),
+    )
+
+
+intent_classifier = _crear_classifier()
@@ -0,0 +1,84 @@
+"""
+Registro local de prompts de agentes.
+
+El prompt base `hwchase17/openai-functions-agent` se distribuye versionado en
+`prompt_templates/` y se carga una sola vez al importar el módulo, de modo que
+crear un agente no requiere acceso a LangChain Hub.
+"""
+from pathlib import Path
+from threading import Lock
+import json
+import logging
+
+from langchain_core.prompts import (
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    MessagesPlaceholder,
+    SystemMessagePromptTemplate,
+)
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TEMPLATES_DIR = Path(__file__).resolve().parent / "prompt_templates"
+FUNCTIONS_AGENT_PROMPT_VERSION = 1
+
+
+def load_prompt_artifact(nombre: str = "openai_functions_agent", version: int = FUNCTIONS_AGENT_PROMPT_VERSION) -> dict:
+    """Lee el artefacto JSON `<nombre>.v<version>.json`"""
+    path = PROMPT_TEMPLATES_DIR / f"{nombre}.v{version}.json"
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_chat_prompt(artifact: dict, system_prompt_template: str | None = None) -> ChatPromptTemplate:
+    """
+    Construye el ChatPromptTemplate del artefacto.
+    Si se indica `system_prompt_template`, reemplaza el mensaje de sistema.
+    """
+    messages = []
+    for message in artifact["messages"]:
+        tipo = message["type"]
+        if tipo == "system":
+            template = system_prompt_template if system_prompt_template is not None else message["template"]
+            messages.append(SystemMessagePromptTemplate.from_template(template))
+        elif tipo == "human":
+            messages.append(HumanMessagePromptTemplate.from_template(message["template"]))
+        elif tipo == "placeholder":
+            messages.append(MessagesPlaceholder(
+                variable_name=message["variable_name"],
+                optional=message.get("optional", False),
+            ))
+        else:
+            raise ValueError(f"Tipo de mensaje no soportado en prompt: {tipo}")
+
+    return ChatPromptTemplate.from_messages(messages)
+
+
+class PromptRegistry:
+    """Prompts de agentes ya combinados con su system prompt"""
+
+    def __init__(self, artifact: dict):
+        self._artifact = artifact
+        self._prompts = {}
+        self._lock = Lock()
+
+    @property
+    def version(self) -> int:
+        return self._artifact["version"]
+
+    def register(self, nombre: str, system_prompt_template: str) -> ChatPromptTemplate:
+        """Combina el prompt base con el system prompt del agente `nombre`"""
+        prompt = build_chat_prompt(self._artifact, system_prompt_template)
+        with self._lock:
+            self._prompts[nombre] = prompt
+        logger.info(f"Prompt registrado: {nombre} (v{self.version})")
+        return prompt
+
+    def get(self, nombre: str) -> ChatPromptTemplate:
+        try:
+            return self._prompts[nombre]
+        except KeyError:
+            raise KeyError(f"No hay prompt registrado para el agente '{nombre}'")
+
+
+prompt_registry = PromptRegistry(load_prompt_artifact())
@@ -1,7 +1,8 @@
 from langchain_core.tools import tool
 import logging
 
-from core.utils.memory_manager import memoria_manager
+from core.agents.prompts import prompt_registry
+from core.agents.registry import agent_registry
 
 logger = logging.getLogger(__name__)
 
@@ -247,35 +248,8 @@ system_prompt_template = """
 
     TONO: Profesional, amigable y servicial.
     """
+prompt_registry.register("public", system_prompt_template)
 
 def get_public_agent(chat_id: int):
     """Crea agente con memoria persistente por chat_id"""
-    from langchain_classic.agents import AgentExecutor, create_openai_functions_agent
-    from langchain_classic import hub
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    from assistant.settings import GEMINI_API_KEY
-    from core.utils.gemini_client import get_gemini_client_args
-
-    # LLM
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        google_api_key=GEMINI_API_KEY,
-        temperature=0.1,
-        client_args=get_gemini_client_args(),
-    )
-
-    prompt = hub.pull("hwchase17/openai-functions-agent")
-    prompt.messages[0].prompt.template = system_prompt_template
-    agent = create_openai_functions_agent(llm, tools, prompt)
-    memory = memoria_manager.get_memory(chat_id)
-
-    agent_executor = AgentExecutor(
-        agent=agent,
-        tools=tools,
-        verbose=True,
-        memory=memory,
-        max_iterations=5,
-        handle_parsing_errors=True
-    )
-
-    return agent_executor
\ No newline at end of file
+    return agent_registry.get_executor("public", tools, chat_id)
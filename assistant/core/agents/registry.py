@@ -0,0 +1,88 @@
+"""
+Registro de agentes compilados.
+
+Cada agente (LLM + prompt + tools) se construye una sola vez por proceso y se
+reutiliza entre chats. Por petición solo se enlazan la memoria del chat y el
+token del usuario.
+"""
+from contextvars import ContextVar
+from threading import Lock
+from typing import Callable
+import logging
+
+from django.conf import settings
+from langchain_classic.agents import AgentExecutor, create_openai_functions_agent
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from core.agents.prompts import prompt_registry
+from core.utils.gemini_client import get_gemini_client_args
+from core.utils.memory_manager import memoria_manager
+
+logger = logging.getLogger(__name__)
+
+# Token del usuario de la petición en curso; lo leen las tools que llaman a la API UBE
+token_actual: ContextVar[str | None] = ContextVar("token_actual", default=None)
+
+
+def build_functions_agent(nombre: str, tools: list):
+    """Construye el runnable del agente `nombre` (LLM + prompt registrado + definición de tools)"""
+    from assistant.settings import GEMINI_API_KEY
+
+    llm = ChatGoogleGenerativeAI(
+        model="gemini-2.0-flash",
+        google_api_key=GEMINI_API_KEY,
+        temperature=0.1,
+        client_args=get_gemini_client_args(),
+    )
+
+    prompt = prompt_registry.get(nombre)
+    return create_openai_functions_agent(llm, tools, prompt)
+
+
+class AgentRegistry:
+    """Caché thread-safe de agentes construidos, uno por tipo de agente"""
+
+    def __init__(self):
+        self._agentes = {}
+        self._lock = Lock()
+
+    def get_agent(self, nombre: str, tools: list, builder: Callable | None = None):
+        """Retorna el agente `nombre`, construyéndolo solo la primera vez"""
+        agente = self._agentes.get(nombre)
+        if agente is not None:
+            return agente
+
+        with self._lock:
+            agente = self._agentes.get(nombre)
+            if agente is None:
+                agente = builder() if builder else build_functions_agent(nombre, tools)
+                self._agentes[nombre] = agente
+                logger.info(f"✅ Agente '{nombre}' construido y registrado")
+        return agente
+
+    def get_executor(self, nombre: str, tools: list, chat_id: int, builder: Callable | None = None) -> AgentExecutor:
+        """Enlaza el agente compartido con la memoria del chat (ventana según el agente)"""
+        agent = self.get_agent(nombre, tools, builder)
+        window = getattr(settings, "CHAT_MEMORY_WINDOWS", {}).get(nombre)
+        memory = memoria_manager.get_memory(chat_id, window=window)
+
+        return AgentExecutor(
+            agent=agent,
+            tools=tools,
+            verbose=True,
+            memory=memory,
+            max_iterations=5,
+            handle_parsing_errors=True
+        )
+
+    def clear(self) -> None:
+        """Descarta los agentes construidos (se reconstruyen en el siguiente uso)"""
+        with self._lock:
+            self._agentes.clear()
+
+    def get_size(self) -> int:
+        """Retorna cantidad de agentes construidos"""
+        return len(self._agentes)
+
+
+agent_registry = AgentRegistry()
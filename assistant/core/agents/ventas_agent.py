@@ -3,6 +3,8 @@ from typing import List
 from langchain_core.tools import tool
 from core.services.ventas_service import fetch_grupos, fetch_malla, fetch_detalle_carrera
 from core.utils.carreras_manager import CarrerasManager
+from core.agents.prompts import prompt_registry
+from core.agents.registry import agent_registry
 from core.utils.memory_manager import memoria_manager
 from core.utils.ventas_utils import formatear_texto_carreras, get_id_by_name, mostrar_progreso, matriculas_en_proceso, \
     validar_campos_completos, limpiar_matricula
@@ -82,7 +84,11 @@ async def detalle_carrera(nombre_carrera: str) -> str:
     Si la carrera no existe, sugiere carreras similares accediendo a la tool listar_carreras.
     """
     carreras: List[CarrerasModel] = await carreras_manager.get_carreras()
-    id_carrera = get_id_by_name(carreras, nombre_carrera)
+    id_carrera = await get_id_by_name(carreras, nombre_carrera, carreras_manager.index)
+
+    if not id_carrera:
+        return "Lo siento, no encontré esa carrera en nuestra base de datos. ¿Podrías verificar si está bien escrita o puedo listarte todas las carreras disponibles?"
+
     detalle: DetalleCarreraModel = await fetch_detalle_carrera(id_carrera)
 
     lineas = [
@@ -128,7 +134,10 @@ async def listar_malla(nombre_carrera: str) -> str:
     - "¿Cuál es la pensum académico?"
     """
     carreras: List[CarrerasModel] = await carreras_manager.get_carreras()
-    id_carrera = get_id_by_name(carreras, nombre_carrera)
+    id_carrera = await get_id_by_name(carreras, nombre_carrera, carreras_manager.index)
+
+    if not id_carrera:
+        return "Lo siento, no encontré esa carrera en nuestra base de datos. ¿Podrías verificar si está bien escrita o puedo listarte todas las carreras disponibles?"
 
     malla_instance = await fetch_malla(id_carrera)
     malla = malla_instance.data
@@ -178,7 +187,7 @@ async def listar_grupos(nombre_carrera: str) -> str:
     """
 
     carreras: CarrerasModel = await carreras_manager.get_carreras()
-    id_carrera = get_id_by_name(carreras, nombre_carrera)
+    id_carrera = await get_id_by_name(carreras, nombre_carrera, carreras_manager.index)
 
     if not id_carrera:
         return "Lo siento, no encontré esa carrera en nuestra base de datos. ¿Podrías verificar si está bien escrita o puedo listarte todas las carreras disponibles?"
@@ -470,51 +479,19 @@ system_prompt_template = """
 
     TONO: Profesional, amigable y servicial.
     """
+prompt_registry.register("ventas", system_prompt_template)
 
 # ==================== LLM Y AGENTE ====================
 
 
 def get_ventas_agent(chat_id: int):
     """Crea agente con memoria persistente por chat_id"""
-    from langchain_classic.agents import AgentExecutor, create_openai_functions_agent
-    from langchain_classic import hub
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    from assistant.settings import GEMINI_API_KEY
-    from core.utils.gemini_client import get_gemini_client_args
 
     # ✅ Validaciones
     if not isinstance(chat_id, int) or chat_id <= 0:
         raise ValueError(f"chat_id inválido: {chat_id}")
 
-    logger.info(f"📊 Creando agente para chat_id: {chat_id}")
-
-    # LLM
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        google_api_key=GEMINI_API_KEY,
-        temperature=0.1,
-        client_args=get_gemini_client_args(),
-    )
-
-    # Prompt
-    prompt = hub.pull("hwchase17/openai-functions-agent")
-    prompt.messages[0].prompt.template = system_prompt_template
-
-    # Agent
-    agent = create_openai_functions_agent(llm, tools, prompt)
-
-    # ✅ CRÍTICO: Obtener memoria del manager (reutilizar si existe)
-    memory = memoria_manager.get_memory(chat_id)
-
-    # Executor
-    agent_executor = AgentExecutor(
-        agent=agent,
-        tools=tools,
-        verbose=True,
-        memory=memory,
-        max_iterations=5,
-        handle_parsing_errors=True
-    )
+    agent_executor = agent_registry.get_executor("ventas", tools, chat_id)
 
-    logger.info(f"✅ Agente listo | Memorias activas: {memoria_manager.get_size()}")
-    return agent_executor
\ No newline at end of file
+    logger.info(f"✅ Agente listo | chat_id: {chat_id} | Memorias activas: {memoria_manager.get_size()}")
+    return agent_executor
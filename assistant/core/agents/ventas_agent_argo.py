@@ -92,7 +92,7 @@ def initialize_agent():
         Lista los grupos de una carrera específica a partir de su nombre.
         Si la carrera no existe o no tiene grupos próximos, retorna un mensaje adecuado.
         """
-        id_carrera = get_id_by_name(agent.carreras, nombre_carrera)
+        id_carrera = await get_id_by_name(agent.carreras, nombre_carrera)
 
         if not id_carrera:
             return f"No se encontró la carrera '{nombre_carrera}'."
@@ -116,7 +116,7 @@ def initialize_agent():
         Lista la malla de una carrera específica a partir de su nombre.
         Si la carrera no existe, retorna un mensaje adecuado.
         """
-        id_carrera = get_id_by_name(agent.carreras, nombre_carrera)
+        id_carrera = await get_id_by_name(agent.carreras, nombre_carrera)
         malla_instance = fetch_malla(id_carrera)
         malla = malla_instance.data if malla_instance else None
 
@@ -1,14 +1,80 @@
 # core/authentication/backend_auth.py
 
+import hashlib
+import httpx
 import requests
 import jwt
 import os
+import time
 import logging
+from threading import Lock
+from django.conf import settings
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
+from core.authentication.supabase_keys import SupabaseKeysUnavailable, supabase_key_store
+from core.utils.http_client import get_http_client
+from core.utils.metrics import medir
+from core.utils.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+UBE_VERIFY_URL = "https://sga.ube.edu.ec/api/auth/verify/"
+
+# Resultado de verificaciones por hash del token: (user, auth) o TOKEN_RECHAZADO
+verification_cache = TTLCache(
+    maxsize=getattr(settings, "AUTH_CACHE_SIZE", 10000),
+    ttl=getattr(settings, "AUTH_CACHE_TTL", 60),
+)
+TOKEN_RECHAZADO = object()
+
+
+class UpstreamAuthError(AuthenticationFailed):
+    """No se pudo contactar al verificador; el token no fue rechazado explícitamente"""
+
+
+def token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def supabase_issuer() -> str | None:
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    return f"{supabase_url.rstrip('/')}/auth/v1" if supabase_url else None
+
+
+def es_token_supabase(token: str) -> bool:
+    """
+    Inspecciona el token sin verificarlo: es de Supabase si tiene forma de JWT
+    (header.payload.firma) y su claim `iss` es el issuer del proyecto Supabase.
+    """
+    if token.count(".") != 2:
+        return False
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return False
+    issuer = supabase_issuer()
+    return issuer is not None and claims.get("iss") == issuer
+
+
+class AuthStats:
+    """Contadores de la autenticación (llamadas a UBE realizadas y evitadas)"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counts = {"ube_verify_calls": 0, "ube_verify_avoided": 0}
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+auth_stats = AuthStats()
+
 
 class SimpleUser:
     """Objeto user temporal para DRF"""
@@ -33,6 +99,30 @@ class BackendTokenAuthentication(BaseAuthentication):
     """
 
     def authenticate(self, request):
+        token = self.get_token(request)
+        if not token:
+            return None
+
+        # ✅ Verificaciones recientes del mismo token se resuelven en memoria
+        cache_key = token_cache_key(token)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        # ✅ El formato del token indica su emisor: JWT de Supabase o token UBE
+        if es_token_supabase(token):
+            auth_stats.incr("ube_verify_avoided")
+            return self._authenticate_supabase_cached(token, cache_key)
+
+        # ✅ Token UBE (tu backend actual)
+        auth_stats.incr("ube_verify_calls")
+        try:
+            user, auth = self.authenticate_ube(token)
+        except AuthenticationFailed as e:
+            self._ube_fallido(e, cache_key)
+        return self._ube_exitoso(user, auth, cache_key)
+
+    def get_token(self, request):
         token = request.headers.get("Authorization") or request.META.get("HTTP_AUTHORIZATION")
 
         if not token:
@@ -41,37 +131,69 @@ class BackendTokenAuthentication(BaseAuthentication):
 
         token = token.replace("Bearer ", "").strip()
         logger.info(f"Token recibido: {token[:20]}...")
+        return token
 
-        # ✅ Intenta primero con UBE (tu backend actual)
-        try:
-            user, auth = self.authenticate_ube(token)
-            logger.info(f"Autenticación exitosa con UBE: {user.username}")
-            return (user, auth)
-        except AuthenticationFailed as e:
-            logger.warning(f"Autenticación UBE fallida: {str(e)}")
+    def _get_cached(self, cache_key):
+        cached = verification_cache.get(cache_key)
+        if cached is TOKEN_RECHAZADO:
+            raise AuthenticationFailed("Token inválido. No es válido en UBE ni en Supabase.")
+        return cached
+
+    def _ube_exitoso(self, user, auth, cache_key):
+        logger.info(f"Autenticación exitosa con UBE: {user.username}")
+        verification_cache.set(cache_key, (user, auth))
+        return (user, auth)
+
+    def _ube_fallido(self, error, cache_key):
+        if isinstance(error, UpstreamAuthError):
+            logger.warning(f"Autenticación UBE no concluyente: {str(error)}")
+            raise AuthenticationFailed("No se pudo verificar el token con UBE. Intenta de nuevo.")
+        logger.warning(f"Autenticación UBE fallida: {str(error)}")
+        self._cache_rechazo(cache_key)
+        raise AuthenticationFailed("Token inválido. No es válido en UBE ni en Supabase.")
 
-        # ✅ Intenta después con Supabase/Google/Facebook
+    def _authenticate_supabase_cached(self, token, cache_key, refrescar=True):
+        """Supabase/Google/Facebook: verificación local del JWT"""
         try:
-            user, auth = self.authenticate_supabase(token)
+            user, auth, exp = self.authenticate_supabase(token, refrescar=refrescar)
             logger.info(f"Autenticación exitosa con Supabase: {user.username} (proveedor: {user.provider})")
+            ttl = verification_cache.ttl if not exp else min(verification_cache.ttl, exp - time.time())
+            if ttl > 0:
+                verification_cache.set(cache_key, (user, auth), ttl=ttl)
             return (user, auth)
+        except UpstreamAuthError:
+            # Sin claves para verificar: no es un rechazo, no se cachea
+            raise
         except AuthenticationFailed as e:
             logger.error(f"Autenticación Supabase fallida: {str(e)}")
+            self._cache_rechazo(cache_key)
             raise AuthenticationFailed("Token inválido. No es válido en UBE ni en Supabase.")
 
+    def _cache_rechazo(self, cache_key):
+        verification_cache.set(
+            cache_key, TOKEN_RECHAZADO,
+            ttl=getattr(settings, "AUTH_NEGATIVE_CACHE_TTL", 30),
+        )
+
     def authenticate_ube(self, token):
         """Autentica contra tu UBE API (backend actual)"""
         try:
             response = requests.get(
-                "https://sga.ube.edu.ec/api/auth/verify/",
+                UBE_VERIFY_URL,
                 headers={"Authorization": f"Bearer {token}"},
                 timeout=5
             )
             logger.info(f"Respuesta UBE: {response.status_code}")
         except requests.RequestException as e:
             logger.error(f"Error conectando con UBE: {str(e)}")
-            raise AuthenticationFailed(f"Error conectando con UBE: {str(e)}")
+            raise UpstreamAuthError(f"Error conectando con UBE: {str(e)}")
+
+        return self._usuario_ube(response, token)
 
+    def _usuario_ube(self, response, token):
+        """Interpreta la respuesta de verify (requests o httpx)"""
+        if response.status_code >= 500:
+            raise UpstreamAuthError(f"UBE respondió {response.status_code}")
         if response.status_code != 200:
             raise AuthenticationFailed("Token inválido en UBE.")
 
@@ -79,42 +201,34 @@ class BackendTokenAuthentication(BaseAuthentication):
         user = SimpleUser(user_data, provider="drf")
         return (user, f"Bearer {token}")
 
-    def authenticate_supabase(self, token):
-        """Autentica contra Supabase JWT (Google, Facebook, etc)"""
+    def authenticate_supabase(self, token, refrescar=True):
+        """
+        Autentica contra Supabase JWT (Google, Facebook, etc).
+        Retorna (user, auth, exp) donde `exp` es el vencimiento del token.
+        Con `refrescar=False` no descarga el JWKS (el llamador ya lo preparó).
+        """
 
-        supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+        expected_iss = supabase_issuer()
 
-        if not supabase_url:
+        if not expected_iss:
             logger.error("NEXT_PUBLIC_SUPABASE_URL no está configurada")
             raise AuthenticationFailed("Supabase no configurado")
 
         try:
-            # ✅ Decodificar sin verificar firma (simplificado)
-            # Supabase ya verifica que el token es válido cuando lo emite
+            # Firma, issuer, audiencia y vencimiento se verifican localmente
+            # con las claves cacheadas (JWKS o secreto HS256)
+            key, algorithms = supabase_key_store.get_signing_key(token, refrescar=refrescar)
             decoded = jwt.decode(
                 token,
-                options={"verify_signature": False}  # No verificamos la firma
+                key=key,
+                algorithms=algorithms,
+                audience=getattr(settings, "SUPABASE_JWT_AUDIENCE", "authenticated"),
+                issuer=expected_iss,
+                options={"require": ["exp", "sub"]},
             )
-
-            logger.info(f"Token JWT decodificado: usuario {decoded.get('email')}")
-
-            # Validar que sea un token de Supabase verificando el issuer (iss)
-            iss = decoded.get('iss')
-            expected_iss = f"{supabase_url.rstrip('/')}/auth/v1"
-
-            logger.info(f"Issuer del token: {iss}")
-            logger.info(f"Issuer esperado: {expected_iss}")
-
-            # Validar que el issuer coincida
-            if iss != expected_iss:
-                logger.warning(f"Issuer no coincide. Token: {iss}, Esperado: {expected_iss}")
-                raise AuthenticationFailed("Token no es de Supabase")
-
-            # Verificar que el token no esté expirado
-            import time
             exp = decoded.get('exp')
-            if exp and exp < time.time():
-                raise AuthenticationFailed("Token expirado")
+
+            logger.info(f"Token JWT verificado: usuario {decoded.get('email')}")
 
             # Extraer datos del token JWT
             user_data = {
@@ -127,8 +241,11 @@ class BackendTokenAuthentication(BaseAuthentication):
             user = SimpleUser(user_data, provider=provider)
 
             logger.info(f"Usuario autenticado: {user.email} (proveedor: {provider})")
-            return (user, token)
+            return (user, token, exp)
 
+        except SupabaseKeysUnavailable as e:
+            logger.error(f"No se pudo verificar la firma del token Supabase: {e}")
+            raise UpstreamAuthError("No se pudo verificar el token de Supabase")
         except jwt.ExpiredSignatureError:
             logger.warning("Token JWT expirado")
             raise AuthenticationFailed("Token de Supabase expirado")
@@ -137,4 +254,54 @@ class BackendTokenAuthentication(BaseAuthentication):
             raise AuthenticationFailed(f"Token de Supabase inválido: {str(e)}")
         except Exception as e:
             logger.error(f"Error verificando token Supabase: {str(e)}", exc_info=True)
-            raise AuthenticationFailed(f"Error verificando token Supabase: {str(e)}")
\ No newline at end of file
+            raise AuthenticationFailed(f"Error verificando token Supabase: {str(e)}")
+
+
+class AsyncBackendTokenAuthentication(BackendTokenAuthentication):
+    """
+    Variante asíncrona para vistas `AsyncAPIView` (core/views/base.py), que
+    esperan `authenticate` en el event loop; la verificación UBE usa el
+    cliente httpx compartido.
+    """
+
+    async def authenticate(self, request):
+        token = self.get_token(request)
+        if not token:
+            return None
+        with medir("auth"):
+            return await self.authenticate_token(token)
+
+    async def authenticate_token(self, token):
+        """Verifica un token ya extraído (p. ej. el enviado por WebSocket)"""
+        cache_key = token_cache_key(token)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        if es_token_supabase(token):
+            auth_stats.incr("ube_verify_avoided")
+            # Descargas del JWKS en un hilo; la verificación es solo CPU
+            await supabase_key_store.asegurar_clave(token)
+            return self._authenticate_supabase_cached(token, cache_key, refrescar=False)
+
+        auth_stats.incr("ube_verify_calls")
+        try:
+            user, auth = await self.aauthenticate_ube(token)
+        except AuthenticationFailed as e:
+            self._ube_fallido(e, cache_key)
+        return self._ube_exitoso(user, auth, cache_key)
+
+    async def aauthenticate_ube(self, token):
+        """Autentica contra la UBE API sin bloquear el event loop"""
+        try:
+            response = await get_http_client().get(
+                UBE_VERIFY_URL,
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=5
+            )
+            logger.info(f"Respuesta UBE: {response.status_code}")
+        except httpx.HTTPError as e:
+            logger.error(f"Error conectando con UBE: {str(e)}")
+            raise UpstreamAuthError(f"Error conectando con UBE: {str(e)}")
+
+        return self._usuario_ube(response, token)
@@ -0,0 +1,179 @@
+"""
+Claves de firma de Supabase para verificar JWT localmente.
+
+- Tokens asimétricos (RS256/ES256): JWKS publicado en
+  `<SUPABASE_URL>/auth/v1/.well-known/jwks.json`, indexado por `kid`.
+- Tokens HS256 (proyectos con secreto compartido): `SUPABASE_JWT_SECRET`.
+
+El JWKS se descarga una vez, se refresca en un hilo de fondo y, ante un `kid`
+desconocido (rotación de claves), se vuelve a descargar como máximo una vez
+por `min_refresh_interval`. Desde código asíncrono esa descarga se hace con
+`asegurar_clave`, en un hilo y compartida entre las peticiones concurrentes.
+"""
+from threading import Event, Lock, Thread
+import asyncio
+import logging
+import os
+import time
+
+import jwt
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+ALGORITMOS_ASIMETRICOS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512", "EdDSA"}
+ALGORITMOS_HMAC = {"HS256", "HS384", "HS512"}
+
+
+class SupabaseKeysUnavailable(Exception):
+    """No hay una clave con la que verificar el token"""
+
+
+class SupabaseKeyStore:
+    """Caché en proceso de las claves de firma de Supabase"""
+
+    def __init__(self, jwks_url: str | None, secret: str | None = None,
+                 refresh_interval: float = 3600, min_refresh_interval: float = 60):
+        self.jwks_url = jwks_url
+        self.secret = secret
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self._keys = {}  # kid -> PyJWK
+        self._last_refresh = 0.0
+        self._loaded = False
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+        self._tarea: asyncio.Future | None = None  # refresco asíncrono en curso
+        self._aviso_sin_secreto = False
+
+    def refresh(self) -> bool:
+        """Descarga el JWKS y reemplaza las claves; retorna False si falla"""
+        if not self.jwks_url:
+            return False
+        with self._lock:
+            self._last_refresh = time.monotonic()
+        return self._descargar()
+
+    def _reclamar_refresh(self) -> bool:
+        """Reserva un refresco si pasó `min_refresh_interval` desde el anterior"""
+        if not self.jwks_url:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_refresh < self.min_refresh_interval:
+                return False
+            self._last_refresh = now
+            return True
+
+    def _descargar(self) -> bool:
+        try:
+            response = requests.get(self.jwks_url, timeout=5)
+            response.raise_for_status()
+            jwk_set = jwt.PyJWKSet.from_dict(response.json())
+        except (requests.RequestException, jwt.PyJWKSetError, ValueError) as e:
+            logger.error(f"Error descargando JWKS de Supabase: {e}")
+            return False
+
+        keys = {key.key_id: key for key in jwk_set.keys if key.key_id}
+        with self._lock:
+            self._keys = keys
+            self._loaded = True
+        logger.info(f"JWKS de Supabase actualizado: {len(keys)} claves")
+        return True
+
+    def start(self) -> None:
+        """Carga inicial (si hace falta) y refresco periódico en segundo plano"""
+        if self._thread is not None or not self.jwks_url:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._refresh_loop, name="supabase-jwks", daemon=True)
+        if not self._loaded:
+            self.refresh()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    async def asegurar_clave(self, token: str) -> None:
+        """
+        Prepara las claves para `get_signing_key(token, refrescar=False)` sin
+        bloquear el event loop: la carga inicial y el refresco por `kid`
+        desconocido se ejecutan en un hilo. Los errores del token se reportan
+        después, al verificarlo.
+        """
+        if self._thread is None and self.jwks_url:
+            await asyncio.to_thread(self.start)
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError:
+            return
+        if header.get("alg") not in ALGORITMOS_ASIMETRICOS or header.get("kid") in self._keys:
+            return
+
+        tarea = self._tarea
+        if tarea is None or tarea.done() or tarea.get_loop() is not asyncio.get_running_loop():
+            if not self._reclamar_refresh():
+                return
+            tarea = self._tarea = asyncio.ensure_future(asyncio.to_thread(self._descargar))
+        # Si una petición se cancela, el refresco sigue para las demás
+        await asyncio.shield(tarea)
+
+    def get_signing_key(self, token: str, refrescar: bool = True):
+        """
+        Retorna (clave, [algoritmo]) para verificar `token`. Con `refrescar`
+        descarga el JWKS en línea si hace falta (solo desde hilos síncronos).
+        """
+        header = jwt.get_unverified_header(token)
+        alg = header.get("alg")
+
+        if alg in ALGORITMOS_HMAC:
+            if not self.secret:
+                if not self._aviso_sin_secreto:
+                    # Todos los tokens HS256 fallarán hasta configurar el secreto
+                    self._aviso_sin_secreto = True
+                    logger.warning(
+                        "⚠️ Token HS256 de Supabase recibido sin SUPABASE_JWT_SECRET; "
+                        "configúralo si el proyecto firma sus tokens con secreto compartido"
+                    )
+                raise SupabaseKeysUnavailable("SUPABASE_JWT_SECRET no está configurado")
+            return self.secret, [alg]
+
+        if alg not in ALGORITMOS_ASIMETRICOS:
+            raise jwt.InvalidAlgorithmError(f"Algoritmo no soportado: {alg}")
+
+        kid = header.get("kid")
+        if refrescar:
+            self.start()
+        key = self._keys.get(kid)
+        if key is None and refrescar and self._reclamar_refresh():
+            # kid nuevo: posible rotación de claves
+            self._descargar()
+            key = self._keys.get(kid)
+
+        if key is None:
+            if not self._loaded:
+                raise SupabaseKeysUnavailable("JWKS de Supabase no disponible")
+            raise jwt.InvalidTokenError(f"kid desconocido: {kid}")
+        return key.key, [alg]
+
+
+def _crear_key_store() -> SupabaseKeyStore:
+    supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+    jwks_url = f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json" if supabase_url else None
+    return SupabaseKeyStore(
+        jwks_url,
+        secret=getattr(settings, "SUPABASE_JWT_SECRET", None),
+        refresh_interval=getattr(settings, "SUPABASE_JWKS_REFRESH", 3600),
+    )
+
+
+supabase_key_store = _crear_key_store()
@@ -0,0 +1,116 @@
+"""
+Benchmark de los índices de chat sobre datos sintéticos.
+
+    python manage.py bench_chat_indexes --chats 50000 --messages 2000000
+
+Inserta chats y mensajes de prueba (con `generate_series`, solo PostgreSQL),
+ejecuta ANALYZE y muestra el plan (EXPLAIN ANALYZE) de las consultas de
+historial, limpieza y mensajes de un chat, indicando si usan los índices.
+Los datos sembrados se eliminan al terminar salvo que se pase `--keep`.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.models import Chat, ChatHistory, Provider
+
+PROVIDER_BENCH = "bench"
+
+
+class Command(BaseCommand):
+    help = "Siembra chats/mensajes sintéticos y muestra los planes de las consultas de chat"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chats", type=int, default=50_000)
+        parser.add_argument("--users", type=int, default=5_000)
+        parser.add_argument("--messages", type=int, default=2_000_000)
+        parser.add_argument("--keep", action="store_true", help="No eliminar los datos sembrados")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("El benchmark requiere PostgreSQL (usa generate_series y EXPLAIN ANALYZE)")
+
+        provider, _ = Provider.objects.get_or_create(
+            name=PROVIDER_BENCH,
+            defaults={"description": "Datos de benchmark", "url": ""},
+        )
+        try:
+            self._seed(provider, options["chats"], options["users"], options["messages"])
+            self._explain(provider)
+        finally:
+            if not options["keep"]:
+                self._cleanup(provider)
+
+    def _seed(self, provider, chats, users, messages):
+        inicio = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Chat._meta.db_table} (user_id, provider_id, title, created_at)
+                SELECT 'bench-' || (g %% %s), %s, 'bench ' || g, now() - g * interval '1 minute'
+                FROM generate_series(1, %s) AS g
+                """,
+                [users, provider.id, chats],
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {ChatHistory._meta.db_table} (chat_id, message, created_at, from_ai)
+                SELECT c.id, 'mensaje ' || g, now() - (%s - g) * interval '1 millisecond', g %% 2 = 1
+                FROM generate_series(1, %s) AS g
+                JOIN (
+                    SELECT id, row_number() OVER (ORDER BY id) - 1 AS n
+                    FROM {Chat._meta.db_table} WHERE provider_id = %s
+                ) AS c ON c.n = g %% %s
+                """,
+                [messages, messages, provider.id, chats],
+            )
+            cursor.execute(f"ANALYZE {Chat._meta.db_table}")
+            cursor.execute(f"ANALYZE {ChatHistory._meta.db_table}")
+        self.stdout.write(
+            f"Sembrados {chats} chats y {messages} mensajes en {time.perf_counter() - inicio:.1f}s"
+        )
+
+    def _cleanup(self, provider):
+        # SQL directo: el CASCADE del ORM cargaría millones de filas en memoria
+        self.stdout.write("Eliminando datos sembrados...")
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                DELETE FROM {ChatHistory._meta.db_table}
+                WHERE chat_id IN (SELECT id FROM {Chat._meta.db_table} WHERE provider_id = %s)
+                """,
+                [provider.id],
+            )
+            cursor.execute(f"DELETE FROM {Chat._meta.db_table} WHERE provider_id = %s", [provider.id])
+            provider.delete()
+
+    def _explain(self, provider):
+        chat = Chat.objects.filter(provider=provider).order_by("id").first()
+        user_id = chat.user_id
+
+        consultas = {
+            "Historial de chats (ChatHistoryView)": (
+                Chat.objects.filter(user_id=user_id).order_by("-id")[:50],
+                "chat_user_id_desc_idx",
+            ),
+            "Chat del usuario (ChatCleanupView)": (
+                Chat.objects.filter(id=chat.id, user_id=user_id),
+                None,  # basta la PK
+            ),
+            "Mensajes de un chat (ai_service)": (
+                ChatHistory.objects.filter(chat_id=chat.id).order_by("created_at")[:50],
+                "chathistory_chat_created_idx",
+            ),
+        }
+
+        for titulo, (queryset, indice) in consultas.items():
+            plan = queryset.explain(analyze=True, buffers=True)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{titulo}"))
+            self.stdout.write(plan)
+            if indice is None:
+                continue
+            if indice in plan:
+                self.stdout.write(self.style.SUCCESS(f"Usa {indice}"))
+            else:
+                self.stdout.write(self.style.WARNING(f"No usa {indice}"))
@@ -0,0 +1,43 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexConcurrentlyIfPostgres(AddIndexConcurrently):
+    """
+    CREATE INDEX CONCURRENTLY en PostgreSQL; en otros motores (SQLite en
+    desarrollo y pruebas) un AddIndex normal.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción;
+    # así el deploy (migrate en el Procfile) no bloquea escrituras en tablas grandes
+    atomic = False
+
+    dependencies = [
+        ('core', '0002_alter_chathistory_options_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfPostgres(
+            model_name='chat',
+            index=models.Index(fields=['user_id', '-id'], name='chat_user_id_desc_idx'),
+        ),
+        AddIndexConcurrentlyIfPostgres(
+            model_name='chathistory',
+            index=models.Index(fields=['chat', 'created_at'], name='chathistory_chat_created_idx'),
+        ),
+    ]
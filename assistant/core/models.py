@@ -18,13 +18,22 @@ class Chat(models.Model):
     def __str__(self):
         return f"Chat {self.id} - User {self.user_id}"
 
-    def set_title_from_first_message(self, first_message):
+    class Meta:
+        indexes = [
+            # Historial de chats del usuario, del más reciente al más antiguo
+            models.Index(fields=['user_id', '-id'], name='chat_user_id_desc_idx'),
+        ]
+
+    @staticmethod
+    def title_from_message(message):
         max_len = 36
-        if len(first_message) <= max_len:
-            self.title = first_message
-        else:
-            self.title = first_message[:max_len-3] + "..."
-        self.save()
+        if len(message) <= max_len:
+            return message
+        return message[:max_len-3] + "..."
+
+    def set_title_from_first_message(self, first_message):
+        self.title = self.title_from_message(first_message)
+        self.save(update_fields=["title"])
 
 class ChatHistory(models.Model):
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE, related_name='messages')
@@ -37,9 +46,14 @@ class ChatHistory(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Mensajes de un chat en orden cronológico
+            models.Index(fields=['chat', 'created_at'], name='chathistory_chat_created_idx'),
+        ]
 
     def save(self, *args, **kwargs):
-        is_first_message = self.chat.messages.count() == 0
+        # Un chat sin título aún no tiene mensajes: no hace falta contarlos
+        is_new = self._state.adding
         super().save(*args, **kwargs)
-        if is_first_message and not self.chat.title:
+        if is_new and not self.chat.title:
             self.chat.set_title_from_first_message(self.message)
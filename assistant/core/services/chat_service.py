@@ -0,0 +1,89 @@
+"""
+Persistencia de chats y turnos de conversación.
+
+Un turno (mensaje del usuario + respuesta de la IA) se guarda en una sola
+transacción con un único INSERT; el título del chat se fija al crearlo o,
+si el chat aún no tiene título, con un UPDATE dentro de la misma transacción.
+Si el agente falla o el cliente se desconecta, se guarda solo el mensaje del
+usuario (`ai_message=None`).
+"""
+from datetime import datetime
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from core.models import Chat, ChatHistory, Provider
+from core.utils.metrics import medir
+from core.utils.ttl_cache import TTLCache
+
+# Los proveedores casi nunca cambian: se evita una consulta por mensaje
+provider_cache = TTLCache(maxsize=32, ttl=300)
+
+
+async def get_provider(name: str) -> Provider:
+    provider = provider_cache.get(name)
+    if provider is None:
+        provider = await sync_to_async(Provider.objects.get)(name=name)
+        provider_cache.set(name, provider)
+    return provider
+
+
+async def obtener_chat(
+    user,
+    provider_name: str,
+    chat_id: int | None = None,
+    first_message: str | None = None
+) -> tuple[Chat, Provider]:
+    """
+    Retorna el chat `chat_id` de `user` o crea uno nuevo; si se conoce el
+    primer mensaje, el chat nuevo se crea ya con su título. Un chat ajeno
+    lanza `Chat.DoesNotExist`, igual que uno inexistente.
+    """
+    with medir("chat_lookup"):
+        provider = await get_provider(provider_name)
+
+        if chat_id:
+            chat = await sync_to_async(Chat.objects.get)(id=chat_id, user_id=str(user.id))
+        else:
+            chat = await sync_to_async(Chat.objects.create)(
+                user_id=str(user.id),
+                provider=provider,
+                title=Chat.title_from_message(first_message) if first_message else None,
+                created_at=datetime.now()
+            )
+    return chat, provider
+
+
+def persist_turn(chat: Chat, user_message: str, ai_message: str | None) -> list[ChatHistory]:
+    """Guarda el mensaje del usuario y la respuesta de la IA (si la hay) en una transacción"""
+    mensajes = [ChatHistory(chat=chat, message=user_message, from_ai=False)]
+    if ai_message is not None:
+        mensajes.append(ChatHistory(chat=chat, message=ai_message, from_ai=True))
+    with transaction.atomic():
+        # bulk_create no llama a ChatHistory.save; el título se fija aquí
+        mensajes = ChatHistory.objects.bulk_create(mensajes)
+        if not chat.title:
+            chat.title = Chat.title_from_message(user_message)
+            Chat.objects.filter(pk=chat.pk).update(title=chat.title)
+    return mensajes
+
+
+async def apersist_turn(chat: Chat, user_message: str, ai_message: str | None) -> list[ChatHistory]:
+    with medir("db_write"):
+        # Protegido de la cancelación: si el cliente se desconecta, el turno igual se guarda
+        return await asyncio.shield(sync_to_async(persist_turn)(chat, user_message, ai_message))
+
+
+def _ultimos_mensajes_qs(chat_id: int, limit: int):
+    # Usa el índice (chat, created_at): lee solo las últimas `limit` filas
+    return ChatHistory.objects.filter(chat_id=chat_id).order_by("-created_at", "-id").values_list("from_ai", "message")[:limit]
+
+
+def ultimos_mensajes(chat_id: int, limit: int) -> list[tuple[bool, str]]:
+    """Últimos `limit` mensajes del chat como (from_ai, message), en orden cronológico"""
+    return list(_ultimos_mensajes_qs(chat_id, limit))[::-1]
+
+
+async def aultimos_mensajes(chat_id: int, limit: int) -> list[tuple[bool, str]]:
+    return [fila async for fila in _ultimos_mensajes_qs(chat_id, limit)][::-1]
@@ -1,8 +1,11 @@
 # core/services/ventas_service.py
 from typing import List
 
-import httpx
+from django.conf import settings
+
 from assistant.settings import API_UBE_URL
+from core.utils.http_client import get_http_client
+from core.utils.ttl_cache import AsyncTTLCache
 from schemas.ventas.carreras import CarrerasModel, DetalleCarreraModel
 from schemas.ventas.grupos import GruposModel
 from schemas.ventas.malla import MallaModel
@@ -10,34 +13,51 @@ from pydantic import TypeAdapter
 
 adapter = TypeAdapter(List[CarrerasModel])
 
+# Cachés por endpoint: mallas y detalles cambian poco, los grupos (cupos) con más frecuencia
+detalle_cache = AsyncTTLCache(maxsize=512, ttl=getattr(settings, "DETALLE_CACHE_TTL", 6 * 3600), name="detalle_carrera")
+malla_cache = AsyncTTLCache(maxsize=512, ttl=getattr(settings, "MALLA_CACHE_TTL", 24 * 3600), name="malla")
+grupos_cache = AsyncTTLCache(maxsize=512, ttl=getattr(settings, "GRUPOS_CACHE_TTL", 300), name="grupos")
+
 async def fetch_carreras() -> List[CarrerasModel]:
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{API_UBE_URL}ventas/carreras/")
-        response.raise_for_status()
-        carreras_data = response.json()
-        return adapter.validate_python(carreras_data)
-
-async def fetch_grupos(id_carrera: int):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{API_UBE_URL}ventas/grupos/{id_carrera}/")
-        response.raise_for_status()
-        data = response.json()
-        grupos_instance = GruposModel(**data)
-        return grupos_instance
+    client = get_http_client()
+    response = await client.get(f"{API_UBE_URL}ventas/carreras/")
+    response.raise_for_status()
+    carreras_data = response.json()
+    return adapter.validate_python(carreras_data)
+
+async def fetch_grupos(id_carrera: int) -> GruposModel:
+    """Grupos de la carrera, con caché corta y coalescencia de peticiones"""
+    return await grupos_cache.get_or_fetch(id_carrera, lambda: _fetch_grupos(id_carrera))
+
+async def _fetch_grupos(id_carrera: int) -> GruposModel:
+    client = get_http_client()
+    response = await client.get(f"{API_UBE_URL}ventas/grupos/{id_carrera}/")
+    response.raise_for_status()
+    data = response.json()
+    grupos_instance = GruposModel(**data)
+    return grupos_instance
 
 async def fetch_malla(id_carrera: int) -> MallaModel:
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{API_UBE_URL}ventas/malla/{id_carrera}/")
-        response.raise_for_status()
-        data = response.json()
-        malla_instance = MallaModel(**data)
-        return malla_instance
+    """Malla de la carrera, con caché larga y coalescencia de peticiones"""
+    return await malla_cache.get_or_fetch(id_carrera, lambda: _fetch_malla(id_carrera))
+
+async def _fetch_malla(id_carrera: int) -> MallaModel:
+    client = get_http_client()
+    response = await client.get(f"{API_UBE_URL}ventas/malla/{id_carrera}/")
+    response.raise_for_status()
+    data = response.json()
+    malla_instance = MallaModel(**data)
+    return malla_instance
 
 async def fetch_detalle_carrera(id_carrera: int) -> DetalleCarreraModel:
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{API_UBE_URL}ventas/carreras/{id_carrera}/")
-        response.raise_for_status()
-        data = response.json()
-        print(data)
-        detalle_instance = DetalleCarreraModel(**data)
-        return detalle_instance
\ No newline at end of file
+    """Detalle de la carrera, con caché larga y coalescencia de peticiones"""
+    return await detalle_cache.get_or_fetch(id_carrera, lambda: _fetch_detalle_carrera(id_carrera))
+
+async def _fetch_detalle_carrera(id_carrera: int) -> DetalleCarreraModel:
+    client = get_http_client()
+    response = await client.get(f"{API_UBE_URL}ventas/carreras/{id_carrera}/")
+    response.raise_for_status()
+    data = response.json()
+    print(data)
+    detalle_instance = DetalleCarreraModel(**data)
+    return detalle_instance
\ No newline at end of file
@@ -0,0 +1,58 @@
+import threading
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from core.authentication.backend_auth import SimpleUser
+from core.views.base import AsyncAPIView
+
+
+class HiloAuthentication:
+    """Autenticador de prueba que registra el hilo en el que se ejecuta"""
+    hilos = []
+
+    async def authenticate(self, request):
+        self.hilos.append(threading.get_ident())
+        token = request.headers.get("Authorization")
+        if token == "Bearer malo":
+            raise AuthenticationFailed("Token inválido")
+        if not token:
+            return None
+        return SimpleUser({"id": "u1", "username": "ana"}), token
+
+    def authenticate_header(self, request):
+        return "Bearer"
+
+
+class PruebaView(AsyncAPIView):
+    authentication_classes = [HiloAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        return Response({"user": request.user.username, "auth": request.auth, "hilo": threading.get_ident()})
+
+
+class AsyncAPIViewTests(SimpleTestCase):
+    def setUp(self):
+        HiloAuthentication.hilos.clear()
+        self.factory = APIRequestFactory()
+        self.view = PruebaView.as_view()
+
+    async def test_autentica_en_el_hilo_del_event_loop(self):
+        response = await self.view(self.factory.get("/", HTTP_AUTHORIZATION="Bearer bueno"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["user"], "ana")
+        self.assertEqual(response.data["auth"], "Bearer bueno")
+        self.assertEqual(HiloAuthentication.hilos, [threading.get_ident()])
+        self.assertEqual(response.data["hilo"], threading.get_ident())
+
+    async def test_token_invalido_retorna_401(self):
+        response = await self.view(self.factory.get("/", HTTP_AUTHORIZATION="Bearer malo"))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_sin_token_retorna_401(self):
+        response = await self.view(self.factory.get("/"))
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,67 @@
+import time
+from unittest.mock import patch
+
+import jwt
+from django.test import SimpleTestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from core.authentication.backend_auth import (
+    BackendTokenAuthentication,
+    SimpleUser,
+    UpstreamAuthError,
+    es_token_supabase,
+    verification_cache,
+)
+
+SUPABASE_URL = "https://proyecto.supabase.co"
+
+
+def token_supabase(iss: str = f"{SUPABASE_URL}/auth/v1") -> str:
+    return jwt.encode({"sub": "u1", "iss": iss, "exp": int(time.time()) + 60}, "secreto-de-pruebas-de-32-bytes!!", algorithm="HS256")
+
+
+@patch.dict("os.environ", {"NEXT_PUBLIC_SUPABASE_URL": SUPABASE_URL})
+class BackendTokenAuthenticationTests(SimpleTestCase):
+    def setUp(self):
+        verification_cache.clear()
+        self.auth = BackendTokenAuthentication()
+        self.factory = APIRequestFactory()
+        self.user = SimpleUser({"id": "7", "username": "ana"})
+
+    def request(self, token: str):
+        return self.factory.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_forma_del_token(self):
+        self.assertTrue(es_token_supabase(token_supabase()))
+        self.assertFalse(es_token_supabase(token_supabase(iss="https://otro.example.com")))
+        self.assertFalse(es_token_supabase("token-opaco-de-ube"))
+
+    def test_verificacion_ube_se_cachea(self):
+        with patch.object(BackendTokenAuthentication, "authenticate_ube", return_value=(self.user, "Bearer abc")) as ube:
+            self.assertEqual(self.auth.authenticate(self.request("abc")), (self.user, "Bearer abc"))
+            self.assertEqual(self.auth.authenticate(self.request("abc")), (self.user, "Bearer abc"))
+        ube.assert_called_once_with("abc")
+
+    def test_rechazo_se_cachea(self):
+        with patch.object(BackendTokenAuthentication, "authenticate_ube", side_effect=AuthenticationFailed("no")) as ube:
+            for _ in range(2):
+                with self.assertRaises(AuthenticationFailed):
+                    self.auth.authenticate(self.request("malo"))
+        ube.assert_called_once()
+
+    def test_error_de_conexion_no_se_cachea(self):
+        with patch.object(BackendTokenAuthentication, "authenticate_ube", side_effect=UpstreamAuthError("caído")) as ube:
+            for _ in range(2):
+                with self.assertRaises(AuthenticationFailed):
+                    self.auth.authenticate(self.request("abc"))
+        self.assertEqual(ube.call_count, 2)
+
+    def test_token_supabase_no_consulta_ube(self):
+        token = token_supabase()
+        with patch.object(BackendTokenAuthentication, "authenticate_ube") as ube, \
+                patch.object(BackendTokenAuthentication, "authenticate_supabase",
+                             return_value=(self.user, token, int(time.time()) + 60)) as supabase:
+            self.assertEqual(self.auth.authenticate(self.request(token)), (self.user, token))
+        ube.assert_not_called()
+        supabase.assert_called_once()
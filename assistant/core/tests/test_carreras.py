@@ -0,0 +1,152 @@
+from unittest.mock import AsyncMock, patch
+import asyncio
+import time
+
+from django.test import SimpleTestCase
+
+from core.utils.carreras_index import CarrerasIndex
+from core.utils.carreras_manager import REINTENTO_REFRESH, CarrerasManager
+from core.utils.ventas_utils import get_id_by_name
+from schemas.ventas.carreras import CarrerasModel
+
+CATALOGO = [
+    CarrerasModel(tipo="Grado", areas=[
+        {"nombre": "Salud", "carreras": [
+            {"id": 1, "nombre": "Enfermería"},
+            {"id": 2, "nombre": "Psicología Clínica"},
+            {"id": 3, "nombre": "Nutrición y Dietética"},
+        ]},
+        {"nombre": "Sociales", "carreras": [
+            {"id": 4, "nombre": "Derecho"},
+            {"id": 5, "nombre": "Contabilidad y Auditoría"},
+        ]},
+    ]),
+    CarrerasModel(tipo="Posgrado", areas=[
+        {"nombre": "Sociales", "carreras": [
+            {"id": 6, "nombre": "Maestría en Derecho Procesal"},
+        ]},
+    ]),
+]
+
+
+class CarrerasIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = CarrerasIndex(CATALOGO)
+
+    def test_resuelve_con_errores_de_tipeo_y_sin_tildes(self):
+        match, _ = self.index.resolve("enfermeria")
+        self.assertEqual(match.id, 1)
+        match, _ = self.index.resolve("psicologia clinca")
+        self.assertEqual(match.id, 2)
+
+    def test_sinonimos(self):
+        match, _ = self.index.resolve("conta")
+        self.assertEqual(match.id, 5)
+
+    def test_distingue_grado_de_maestria(self):
+        match, _ = self.index.resolve("maestria en derecho procesal")
+        self.assertEqual(match.id, 6)
+
+
+class GetIdByNameTests(SimpleTestCase):
+    def setUp(self):
+        self.index = CarrerasIndex(CATALOGO)
+
+    async def test_coincidencia_local_no_consulta_al_llm(self):
+        with patch("core.utils.ventas_utils._get_id_by_llm", new=AsyncMock()) as llm:
+            self.assertEqual(await get_id_by_name(CATALOGO, "enfermeria", self.index), 1)
+        llm.assert_not_awaited()
+
+    async def test_candidatos_debiles_envian_el_catalogo_completo(self):
+        with patch("core.utils.ventas_utils._get_id_by_llm", new=AsyncMock(return_value=3)) as llm:
+            self.assertEqual(await get_id_by_name(CATALOGO, "quiero ser nutriologo", self.index), 3)
+        prompts = llm.await_args.args[0]
+        self.assertEqual(prompts, self.index.catalogo)
+
+    async def test_cero_del_llm_es_none(self):
+        with patch("core.utils.ventas_utils._get_id_by_llm", new=AsyncMock(return_value=0)):
+            self.assertIsNone(await get_id_by_name(CATALOGO, "astronomia", self.index))
+
+    async def test_id_fuera_del_catalogo_es_none(self):
+        with patch("core.utils.ventas_utils._get_id_by_llm", new=AsyncMock(return_value=999)):
+            self.assertIsNone(await get_id_by_name(CATALOGO, "astronomia", self.index))
+
+
+class CarrerasManagerTests(SimpleTestCase):
+    def setUp(self):
+        # Instancia nueva por prueba; el singleton del proceso se restaura al final
+        self.singleton = CarrerasManager._instance
+        CarrerasManager._instance = None
+        self.manager = CarrerasManager()
+        self.addCleanup(setattr, CarrerasManager, "_instance", self.singleton)
+
+    def fetch(self, **kwargs):
+        return patch("core.utils.carreras_manager.fetch_carreras", new=AsyncMock(**kwargs))
+
+    async def test_arranque_en_frio_comparte_una_consulta(self):
+        liberar = asyncio.Event()
+
+        async def lento():
+            await liberar.wait()
+            return CATALOGO
+
+        with self.fetch(side_effect=lento) as fetch:
+            llamadas = [asyncio.ensure_future(self.manager.get_carreras()) for _ in range(5)]
+            await asyncio.sleep(0)
+            liberar.set()
+            resultados = await asyncio.gather(*llamadas)
+
+        self.assertEqual(fetch.await_count, 1)
+        self.assertTrue(all(r is CATALOGO for r in resultados))
+        self.assertIsNotNone(self.manager.index)
+
+        # Vence entre TTL * (1 - jitter) y TTL
+        ttl, jitter = self.manager._cache_duration, self.manager._refresh_jitter
+        self.assertGreaterEqual(self.manager._refresh_at, self.manager._last_fetch + ttl * (1 - jitter))
+        self.assertLessEqual(self.manager._refresh_at, self.manager._last_fetch + ttl)
+
+    async def test_catalogo_vencido_se_sirve_mientras_se_actualiza(self):
+        antiguo, nuevo = CATALOGO[:1], CATALOGO
+        self.manager._carreras = antiguo
+        liberar = asyncio.Event()
+
+        async def lento():
+            await liberar.wait()
+            return nuevo
+
+        with self.fetch(side_effect=lento) as fetch:
+            for _ in range(3):
+                self.assertIs(await self.manager.get_carreras(), antiguo)
+            await asyncio.sleep(0)
+            self.assertEqual(fetch.await_count, 1)
+
+            liberar.set()
+            await self.manager._refresh_task
+
+        self.assertIs(await self.manager.get_carreras(), nuevo)
+
+    async def test_error_conserva_el_catalogo_y_reintenta(self):
+        antiguo = CATALOGO[:1]
+        self.manager._carreras = antiguo
+
+        with self.fetch(side_effect=RuntimeError("API caída")) as fetch:
+            self.assertIs(await self.manager.get_carreras(), antiguo)
+            await self.manager._refresh_task
+            self.assertIs(self.manager._carreras, antiguo)
+            self.assertGreater(self.manager._refresh_at, time.monotonic() + REINTENTO_REFRESH - 5)
+
+            # Antes de REINTENTO_REFRESH no se vuelve a consultar
+            self.assertIs(await self.manager.get_carreras(), antiguo)
+            self.assertEqual(fetch.await_count, 1)
+
+            with patch("core.utils.carreras_manager.time") as reloj:
+                reloj.monotonic.return_value = self.manager._refresh_at + 1
+                await self.manager.get_carreras()
+                await self.manager._refresh_task
+            self.assertEqual(fetch.await_count, 2)
+
+    async def test_error_en_frio_llega_al_llamador(self):
+        with self.fetch(side_effect=RuntimeError("API caída")):
+            with self.assertRaises(RuntimeError):
+                await self.manager.get_carreras()
+        self.assertIsNone(self.manager._carreras)
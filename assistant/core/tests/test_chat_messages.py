@@ -0,0 +1,56 @@
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+
+from core.models import Chat, ChatHistory
+from core.tests.test_pagination import VistaAutenticadaMixin
+from core.views.chat_messages import ChatMessagesView
+
+
+class ChatMessagesViewTests(VistaAutenticadaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.chat = Chat.objects.create(user_id="7", provider=self.provider, title="chat")
+        ChatHistory.objects.bulk_create([
+            ChatHistory(chat=self.chat, message=f"m{i}", from_ai=bool(i % 2)) for i in range(5)
+        ])
+        self.view = ChatMessagesView.as_view()
+
+    async def pedir(self, query="", **extra):
+        return await self.view(self.get(f"/chat/{self.chat.id}/messages/{query}", **extra), chat_id=self.chat.id)
+
+    async def test_paginas_hacia_atras_en_orden_cronologico(self):
+        response = await self.pedir("?page_size=2")
+        self.assertEqual([m["message"] for m in response.data["results"]], ["m3", "m4"])
+
+        response = await self.pedir(f"?page_size=2&cursor={response.data['older_cursor']}")
+        self.assertEqual([m["message"] for m in response.data["results"]], ["m1", "m2"])
+        self.assertTrue(response.data["has_newer"])
+
+    async def test_newer_cursor_trae_mensajes_nuevos(self):
+        response = await self.pedir("?page_size=10")
+        newer = response.data["newer_cursor"]
+        await sync_to_async(ChatHistory.objects.create)(chat=self.chat, message="m5", from_ai=False)
+
+        response = await self.pedir(f"?cursor={newer}")
+        self.assertEqual([m["message"] for m in response.data["results"]], ["m5"])
+
+    async def test_fields(self):
+        response = await self.pedir("?fields=id,message")
+        self.assertEqual(set(response.data["results"][0]), {"id", "message"})
+        response = await self.pedir("?fields=password")
+        self.assertEqual(response.status_code, 400)
+
+    async def test_etag_y_304(self):
+        response = await self.pedir()
+        etag = response["ETag"]
+        response = await self.pedir(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        await sync_to_async(ChatHistory.objects.create)(chat=self.chat, message="m5", from_ai=False)
+        response = await self.pedir(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    async def test_chat_ajeno(self):
+        ajeno = await sync_to_async(Chat.objects.create)(user_id="otro", provider=self.provider)
+        response = await self.view(self.get(f"/chat/{ajeno.id}/messages/"), chat_id=ajeno.id)
+        self.assertEqual(response.status_code, 404)
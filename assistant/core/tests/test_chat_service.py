@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+
+from core.models import Chat, ChatHistory, Provider
+from core.services.chat_service import persist_turn, ultimos_mensajes
+from core.views.chat import ChatStreamView
+
+
+async def agente_interrumpido(**kwargs):
+    yield "category", {"category": "public"}
+    yield "token", {"delta": "Ho"}
+    raise AssertionError("el cliente cerró antes de llegar aquí")
+
+
+class PersistTurnTests(TestCase):
+    def setUp(self):
+        self.provider = Provider.objects.create(name="web", description="Web", url="https://example.com")
+        self.chat = Chat.objects.create(user_id="7", provider=self.provider)
+
+    def test_turno_completo_y_titulo(self):
+        persist_turn(self.chat, "¿Qué carreras tienen?", "Derecho y Enfermería.")
+        self.assertEqual(
+            ultimos_mensajes(self.chat.id, 10),
+            [(False, "¿Qué carreras tienen?"), (True, "Derecho y Enfermería.")],
+        )
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.title, "¿Qué carreras tienen?")
+
+    def test_sin_respuesta_guarda_solo_el_mensaje_del_usuario(self):
+        persist_turn(self.chat, "hola", None)
+        self.assertEqual(ultimos_mensajes(self.chat.id, 10), [(False, "hola")])
+
+    async def test_stream_interrumpido_conserva_el_mensaje_del_usuario(self):
+        with patch("core.views.chat.stream_message", side_effect=agente_interrumpido):
+            eventos = ChatStreamView()._eventos(self.chat, "hola", "tok", self.provider)
+            await eventos.__anext__()
+            await eventos.__anext__()
+            # Desconexión del cliente: Django cierra el generador
+            await eventos.aclose()
+
+        mensajes = await sync_to_async(list)(ChatHistory.objects.filter(chat=self.chat).values_list("from_ai", "message"))
+        self.assertEqual(mensajes, [(False, "hola")])
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from core.models import Chat, ChatHistory
+from core.services.chat_service import provider_cache
+from core.tests.test_pagination import TOKEN, VistaAutenticadaMixin
+from core.views.chat import ChatStreamView
+
+
+async def stream_falso(chat_id, user_message, token, provider):
+    yield "category", {"category": "public"}
+    yield "token", {"delta": "Hola"}
+    yield "done", {"respuesta": "Hola"}
+
+
+class ChatStreamViewTests(VistaAutenticadaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        provider_cache.clear()
+        self.view = ChatStreamView.as_view()
+
+    def post(self, data, **extra):
+        return self.factory.post("/chat/stream/", data, format="json", HTTP_ACCEPT="text/event-stream", **extra)
+
+    async def test_accept_event_stream(self):
+        with patch("core.views.chat.stream_message", stream_falso):
+            response = await self.view(self.post(
+                {"provider": "web", "message": "Hola"},
+                HTTP_AUTHORIZATION=f"Bearer {TOKEN}",
+            ))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            cuerpo = b"".join([parte async for parte in response.streaming_content]).decode()
+
+        eventos = [frame.split("\n")[0] for frame in cuerpo.strip().split("\n\n")]
+        self.assertEqual(eventos, ["event: category", "event: token", "event: done"])
+        self.assertEqual(await ChatHistory.objects.acount(), 2)
+
+    async def test_error_como_evento(self):
+        response = await self.view(self.post({"provider": "web", "message": "Hola"}))
+        response.render()
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(response.content.decode().startswith("event: error\ndata: "))
+
+    async def test_chat_ajeno(self):
+        ajeno = await Chat.objects.acreate(user_id="otro", provider=self.provider)
+        with patch("core.views.chat.stream_message", stream_falso):
+            response = await self.view(self.post(
+                {"provider": "web", "message": "Hola", "chat_id": ajeno.id},
+                HTTP_AUTHORIZATION=f"Bearer {TOKEN}",
+            ))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(await ChatHistory.objects.acount(), 0)
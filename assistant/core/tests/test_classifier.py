@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from core.agents.classifier import classification_cache, classify_query
+from core.agents.intent_classifier import TERMINOS_POR_CATEGORIA, IntentClassifier
+
+
+class IntentClassifierTests(SimpleTestCase):
+    def setUp(self):
+        self.classifier = IntentClassifier(TERMINOS_POR_CATEGORIA, threshold=0.75)
+
+    def test_casos_claros(self):
+        self.assertEqual(self.classifier.classify("¿Cuál es la malla de Derecho?")[0], "ventas")
+        self.assertEqual(self.classifier.classify("Olvidé mi contraseña")[0], "soporte_ti")
+        self.assertEqual(self.classifier.classify("¿Qué becas ofrecen?")[0], "public")
+
+    def test_ambiguos_van_al_llm(self):
+        self.assertIsNone(self.classifier.classify("hola")[0])
+        self.assertIsNone(self.classifier.classify("horario del correo")[0])
+        stats = self.classifier.get_stats()
+        self.assertEqual((stats["hits"], stats["fallbacks"]), (0, 2))
+
+
+@patch("core.agents.classifier.intent_classifier.classify", return_value=(None, 0.0))
+class ClassifyQueryCacheTests(SimpleTestCase):
+    def setUp(self):
+        classification_cache.clear()
+
+    def gemini(self, respuesta: str) -> MagicMock:
+        llm = MagicMock()
+        llm.return_value.ainvoke = AsyncMock(return_value=SimpleNamespace(content=respuesta))
+        return llm
+
+    async def test_mensajes_equivalentes_usan_la_cache(self, _):
+        llm = self.gemini("ventas")
+        with patch("core.agents.classifier.ChatGoogleGenerativeAI", llm):
+            self.assertEqual(await classify_query("¿Cuánto cuesta Derecho?"), "ventas")
+            self.assertEqual(await classify_query("cuanto cuesta derecho"), "ventas")
+        self.assertEqual(llm.return_value.ainvoke.await_count, 1)
+
+    async def test_respuesta_fuera_de_categorias_no_se_cachea(self, _):
+        llm = self.gemini("no estoy seguro")
+        with patch("core.agents.classifier.ChatGoogleGenerativeAI", llm):
+            await classify_query("algo raro")
+            await classify_query("algo raro")
+        self.assertEqual(llm.return_value.ainvoke.await_count, 2)
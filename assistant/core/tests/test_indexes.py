@@ -0,0 +1,24 @@
+from django.db import connection
+from django.test import TestCase
+
+from core.models import Chat, ChatHistory
+from core.services.chat_service import _ultimos_mensajes_qs
+
+
+class ChatIndexesTests(TestCase):
+    """La migración 0003 se aplica en cualquier motor y las consultas usan los índices"""
+
+    def test_historial_de_chats_usa_indice(self):
+        plan = Chat.objects.filter(user_id="7").order_by("-id").explain()
+        self.assertIn("chat_user_id_desc_idx", plan)
+
+    def test_ultimos_mensajes_usa_indice(self):
+        plan = _ultimos_mensajes_qs(1, 20).explain()
+        self.assertIn("chathistory_chat_created_idx", plan)
+
+    def test_indices_creados(self):
+        with connection.cursor() as cursor:
+            chat = connection.introspection.get_constraints(cursor, Chat._meta.db_table)
+            mensajes = connection.introspection.get_constraints(cursor, ChatHistory._meta.db_table)
+        self.assertIn("chat_user_id_desc_idx", chat)
+        self.assertIn("chathistory_chat_created_idx", mensajes)
@@ -0,0 +1,92 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.utils.memory_backends import CacheMemoryBackend, LocalMemoryBackend, MensajeCompacto
+
+
+class LocalMemoryBackendTests(SimpleTestCase):
+    def crear(self, **kwargs) -> LocalMemoryBackend:
+        opciones = {"ttl": timedelta(hours=1), "max_chats": 10, "sweep_interval": 3600, **kwargs}
+        backend = LocalMemoryBackend(**opciones)
+        self.addCleanup(backend.stop)
+        return backend
+
+    def test_lru_por_cantidad_de_chats(self):
+        backend = self.crear(max_chats=2)
+        backend.save(1, [("h", "uno")])
+        backend.save(2, [("h", "dos")])
+        backend.load(1)
+        backend.save(3, [("h", "tres")])
+
+        self.assertEqual(backend.load(1), [("h", "uno")])
+        self.assertIsNone(backend.load(2))
+        self.assertEqual(backend.get_stats()["evictions"], 1)
+
+    def test_expiracion_y_barrido(self):
+        backend = self.crear()
+        backend.save(1, [("h", "uno")])
+        backend.save(2, [("h", "dos")])
+
+        futuro = time.monotonic() + 3601
+        with patch("core.utils.memory_backends.time.monotonic", return_value=futuro):
+            self.assertIsNone(backend.load(1))
+            self.assertEqual(backend.sweep(), 1)
+        self.assertEqual(backend.size(), 0)
+        self.assertEqual(backend.get_stats()["expirations"], 2)
+
+    def test_presupuesto_de_bytes(self):
+        backend = self.crear(max_bytes=2000, compress_threshold=None)
+        for chat_id in range(10):
+            backend.save(chat_id, [("h", "x" * 400)])
+
+        stats = backend.get_stats()
+        self.assertLessEqual(stats["resident_bytes"], 2000)
+        self.assertGreater(stats["evictions"], 0)
+        # El último chat guardado nunca se desaloja
+        self.assertEqual(backend.load(9), [("h", "x" * 400)])
+
+    def test_bytes_residentes_se_descuentan(self):
+        backend = self.crear()
+        backend.save(1, [("h", "uno"), ("a", "respuesta")])
+        backend.save(1, [("h", "uno")])
+        backend.delete(1)
+        self.assertEqual(backend.get_stats()["resident_bytes"], 0)
+
+
+class MensajeCompactoTests(SimpleTestCase):
+    def test_compresion_ida_y_vuelta(self):
+        texto = "La malla de Derecho tiene 8 periodos. " * 50
+        mensaje = MensajeCompacto("a", texto, umbral_compresion=512)
+        self.assertTrue(mensaje.comprimido)
+        self.assertLess(len(mensaje.datos), len(texto.encode()))
+        self.assertEqual(mensaje.registro(), ("a", texto))
+
+    def test_mensajes_cortos_sin_comprimir(self):
+        mensaje = MensajeCompacto("h", "hola ñandú", umbral_compresion=512)
+        self.assertFalse(mensaje.comprimido)
+        self.assertEqual(mensaje.registro(), ("h", "hola ñandú"))
+
+
+class CacheMemoryBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = CacheMemoryBackend("default", ttl=timedelta(hours=1), key_prefix="test_memoria")
+
+    def test_ida_y_vuelta(self):
+        self.backend.save(1, [("h", "hola"), ("a", "¿En qué te ayudo?")])
+        self.assertEqual(self.backend.load(1), [("h", "hola"), ("a", "¿En qué te ayudo?")])
+        self.backend.delete(1)
+        self.assertIsNone(self.backend.load(1))
+
+    async def test_ida_y_vuelta_asincrona(self):
+        await self.backend.asave(2, [("h", "hola")])
+        self.assertEqual(await self.backend.aload(2), [("h", "hola")])
+        await self.backend.adelete(2)
+        self.assertIsNone(await self.backend.aload(2))
+
+    def test_size_desconocido(self):
+        self.backend.save(3, [("h", "hola")])
+        self.assertIsNone(self.backend.size())
+        self.assertEqual(self.backend.get_stats(), {"chats": None})
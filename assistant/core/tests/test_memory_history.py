@@ -0,0 +1,64 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from django.test import SimpleTestCase
+from langchain_core.messages import AIMessage, HumanMessage
+
+from core.utils.memory_backends import ROL_RESUMEN, BackendChatMessageHistory, LocalMemoryBackend
+
+FILAS = [(False, "¿Qué carreras tienen?"), (True, "Derecho y Enfermería."), (False, "¿Y Derecho?"), (True, "Dura 8 periodos.")]
+
+
+class BackendChatMessageHistoryTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = LocalMemoryBackend(ttl=timedelta(hours=1), max_chats=10, sweep_interval=3600)
+        self.addCleanup(self.backend.stop)
+
+    def historial(self, **kwargs) -> BackendChatMessageHistory:
+        opciones = {"window": 10, "max_messages": 100, **kwargs}
+        return BackendChatMessageHistory(1, self.backend, **opciones)
+
+    def test_rehidrata_desde_chathistory(self):
+        cargar = lambda chat_id, limit: FILAS[-limit:]
+        historial = self.historial(window=2, cargar=cargar)
+
+        self.assertEqual([m.content for m in historial.messages], ["¿Y Derecho?", "Dura 8 periodos."])
+        self.assertEqual(self.backend.load(1), [("h", "¿Y Derecho?"), ("a", "Dura 8 periodos.")])
+
+    async def test_rehidrata_asincrono(self):
+        historial = self.historial(acargar=AsyncMock(return_value=FILAS))
+        mensajes = await historial.aget_messages()
+        self.assertIsInstance(mensajes[0], HumanMessage)
+        self.assertIsInstance(mensajes[1], AIMessage)
+        self.assertEqual(len(mensajes), 4)
+
+    async def test_ventana_y_maximo_guardado(self):
+        historial = self.historial(window=2, max_messages=3)
+        for i in range(3):
+            await historial.aadd_messages([HumanMessage(content=f"p{i}"), AIMessage(content=f"r{i}")])
+
+        self.assertEqual([m.content for m in await historial.aget_messages()], ["p2", "r2"])
+        self.assertEqual(await self.backend.aload(1), [("a", "r1"), ("h", "p2"), ("a", "r2")])
+
+    def test_presupuesto_de_tokens(self):
+        self.backend.save(1, [("h", "a" * 40), ("a", "b" * 40), ("h", "c" * 10)])
+        historial = self.historial(token_budget=50)
+        with patch("core.utils.memory_backends.contar_tokens", side_effect=len):
+            self.assertEqual([m.content for m in historial.messages], ["b" * 40, "c" * 10])
+
+    async def test_resumen_en_segundo_plano(self):
+        resumidor = AsyncMock(return_value="El usuario pregunta por Derecho.")
+        historial = self.historial(token_budget=30, resumidor=resumidor)
+        with patch("core.utils.memory_backends.contar_tokens", side_effect=len):
+            await historial.aadd_messages([HumanMessage(content="a" * 20), AIMessage(content="b" * 20)])
+            await historial.aadd_messages([HumanMessage(content="c" * 10)])
+            await asyncio.gather(*BackendChatMessageHistory._tareas)
+
+            registros = await self.backend.aload(1)
+            self.assertEqual(registros[0], (ROL_RESUMEN, "El usuario pregunta por Derecho."))
+            self.assertEqual(registros[1:], [("a", "b" * 20), ("h", "c" * 10)])
+            resumidor.assert_awaited_once_with(None, [("h", "a" * 20)])
+
+            mensajes = await historial.aget_messages()
+        self.assertIn("El usuario pregunta por Derecho.", mensajes[0].content)
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from core.agents.classifier import etiqueta_categoria, route_message
+from core.utils.metrics import Counter, Histogram, MetricsRegistry, chat_category_total
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_render_formato_prometheus(self):
+        registry = MetricsRegistry()
+        contador = registry.register(Counter("ube_prueba_total", "Prueba", ("tipo",)))
+        histograma = registry.register(Histogram("ube_prueba_seconds", "Prueba", ("stage",), buckets=(0.1, 1)))
+        contador.inc("a")
+        contador.inc("a")
+        histograma.observe(0.05, "auth")
+        histograma.observe(2, "auth")
+
+        texto = registry.render()
+        self.assertIn('ube_prueba_total{tipo="a"} 2', texto)
+        self.assertIn('ube_prueba_seconds_bucket{stage="auth",le="0.1"} 1', texto)
+        self.assertIn('ube_prueba_seconds_bucket{stage="auth",le="+Inf"} 2', texto)
+        self.assertIn('ube_prueba_seconds_count{stage="auth"} 2', texto)
+
+
+class CategoriaTests(SimpleTestCase):
+    def test_etiqueta_acotada(self):
+        self.assertEqual(etiqueta_categoria("ventas"), "ventas")
+        self.assertEqual(etiqueta_categoria("La categoría es: ventas"), "other")
+
+    async def test_categoria_libre_de_gemini_no_crea_etiquetas(self):
+        agente = AsyncMock()
+        agente.ainvoke.return_value = {"output": "ok"}
+        with patch("core.agents.classifier.classify_query", AsyncMock(return_value="otra cosa")), \
+                patch("core.agents.classifier.get_agent", return_value=agente):
+            await route_message(1, "hola", "tok", provider=SimpleNamespace(id=1))
+
+        etiquetas = {labels["category"] for _, labels, _ in chat_category_total.samples()}
+        self.assertNotIn("otra cosa", etiquetas)
+        self.assertIn("other", etiquetas)
+
+
+class MetricsViewTests(SimpleTestCase):
+    @override_settings(METRICS_TOKEN=None, METRICS_PUBLIC=False)
+    def test_sin_token_no_se_expone(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    @override_settings(METRICS_TOKEN=None, METRICS_PUBLIC=True)
+    def test_publico_explicito(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE ube_chat_stage_seconds histogram", response.content.decode())
+
+    @override_settings(METRICS_TOKEN="secreto")
+    def test_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer otro").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secreto").status_code, 200)
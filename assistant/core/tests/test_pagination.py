@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory
+
+from core.authentication.backend_auth import SimpleUser, token_cache_key, verification_cache
+from core.models import Chat, Provider
+from core.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, get_page_size
+from core.views.chat_history import ChatHistoryView
+
+TOKEN = "token-de-prueba"
+
+
+class CursorTests(SimpleTestCase):
+    def test_ida_y_vuelta(self):
+        cursor = encode_cursor({"id": 120})
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), {"id": 120})
+        self.assertIsNone(decode_cursor(None))
+
+    def test_cursor_invalido(self):
+        for cursor in ("abc", encode_cursor([1, 2])):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_page_size_acotado(self):
+        self.assertEqual(get_page_size(None, default=20, maximo=100), 20)
+        self.assertEqual(get_page_size("500", default=20, maximo=100), 100)
+        self.assertEqual(get_page_size("0", default=20, maximo=100), 1)
+        self.assertEqual(get_page_size("abc", default=20, maximo=100), 20)
+
+
+class VistaAutenticadaMixin:
+    def setUp(self):
+        verification_cache.clear()
+        verification_cache.set(token_cache_key(TOKEN), (SimpleUser({"id": "7", "username": "ana"}), TOKEN))
+        self.factory = APIRequestFactory()
+        self.provider = Provider.objects.create(name="web", description="Web", url="https://example.com")
+
+    def get(self, path, **extra):
+        return self.factory.get(path, HTTP_AUTHORIZATION=f"Bearer {TOKEN}", **extra)
+
+
+class ChatHistoryViewTests(VistaAutenticadaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.chats = [Chat.objects.create(user_id="7", provider=self.provider, title=f"chat {i}") for i in range(5)]
+        Chat.objects.create(user_id="otro", provider=self.provider, title="ajeno")
+        self.view = ChatHistoryView.as_view()
+
+    async def test_recorre_todas_las_paginas(self):
+        vistos, cursor = [], None
+        while True:
+            path = "/chat/history/?page_size=2" + (f"&cursor={cursor}" if cursor else "")
+            response = await self.view(self.get(path))
+            self.assertEqual(response.status_code, 200)
+            vistos += [chat["id"] for chat in response.data["results"]]
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(vistos, [chat.id for chat in reversed(self.chats)])
+
+    async def test_cursor_invalido(self):
+        response = await self.view(self.get("/chat/history/?cursor=abc"))
+        self.assertEqual(response.status_code, 400)
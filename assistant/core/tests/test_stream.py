@@ -0,0 +1,56 @@
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from langchain_core.messages import AIMessageChunk
+
+from core.agents.classifier import stream_message
+from core.models import Chat, ChatHistory, Provider
+from core.utils.memory_manager import memoria_manager
+
+
+class AgenteFalso:
+    """
+    Imita el AgentExecutor en streaming: si conserva la memoria, la carga con
+    el método síncrono, como hace AgentExecutorIterator.
+    """
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.inputs = None
+
+    async def astream_events(self, inputs, config=None, version=None):
+        if self.memory is not None:
+            self.memory.load_memory_variables(inputs)
+        self.inputs = inputs
+        yield {"event": "on_chat_model_stream", "data": {"chunk": AIMessageChunk(content="Hola")}, "parent_ids": ["raiz"]}
+        yield {"event": "on_chain_end", "data": {"output": {"output": "Hola, ¿en qué te ayudo?"}}, "parent_ids": []}
+
+
+class StreamMessageTests(TestCase):
+    def setUp(self):
+        self.provider = Provider.objects.create(name="web", description="Web", url="https://example.com")
+        self.chat = Chat.objects.create(user_id="7", provider=self.provider, title="Carreras")
+        ChatHistory.objects.bulk_create([
+            ChatHistory(chat=self.chat, message="¿Qué carreras tienen?", from_ai=False),
+            ChatHistory(chat=self.chat, message="Derecho y Enfermería.", from_ai=True),
+        ])
+        # Chat frío: sin memoria en el backend (reinicio, TTL u otro worker)
+        memoria_manager.clear_memory(self.chat.id)
+
+    async def test_chat_frio_se_rehidrata_sin_consultas_sincronas(self):
+        agente = AgenteFalso(await sync_to_async(memoria_manager.get_memory)(self.chat.id))
+
+        with patch("core.agents.classifier.classify_query", AsyncMock(return_value="public")), \
+                patch("core.agents.classifier.get_agent", return_value=agente):
+            eventos = [e async for e in stream_message(self.chat.id, "¿Y cuánto cuesta?", "tok", self.provider)]
+
+        self.assertEqual([evento for evento, _ in eventos], ["category", "token", "done"])
+        self.assertEqual(eventos[-1][1]["respuesta"], "Hola, ¿en qué te ayudo?")
+        self.assertEqual(
+            [m.content for m in agente.inputs["chat_history"]],
+            ["¿Qué carreras tienen?", "Derecho y Enfermería."],
+        )
+
+        registros = await memoria_manager.backend.aload(self.chat.id)
+        self.assertEqual(registros[-2:], [("h", "¿Y cuánto cuesta?"), ("a", "Hola, ¿en qué te ayudo?")])
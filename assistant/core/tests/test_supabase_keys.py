@@ -0,0 +1,74 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.test import SimpleTestCase
+
+from core.authentication.supabase_keys import SupabaseKeyStore, SupabaseKeysUnavailable
+
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def firmar(kid: str) -> str:
+    return jwt.encode({"sub": "u1", "exp": int(time.time()) + 60}, PRIVATE_KEY, algorithm="RS256", headers={"kid": kid})
+
+
+def jwk(kid: str) -> jwt.PyJWK:
+    datos = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(PRIVATE_KEY.public_key()))
+    return jwt.PyJWK({**datos, "kid": kid, "alg": "RS256"})
+
+
+class SupabaseKeyStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.store = SupabaseKeyStore("https://example.supabase.co/auth/v1/.well-known/jwks.json")
+        # Sin hilo de refresco periódico en las pruebas
+        self.store._thread = object()
+        self.store._loaded = True
+        self.descargas = []
+
+    def descargar(self, kid: str):
+        def _descargar():
+            self.descargas.append(threading.get_ident())
+            time.sleep(0.05)
+            self.store._keys = {kid: jwk(kid)}
+            return True
+        return _descargar
+
+    async def test_kid_desconocido_se_descarga_fuera_del_loop(self):
+        with patch.object(self.store, "_descargar", side_effect=self.descargar("nuevo")):
+            await self.store.asegurar_clave(firmar("nuevo"))
+        self.assertEqual(len(self.descargas), 1)
+        self.assertNotEqual(self.descargas[0], threading.get_ident())
+
+        key, algorithms = self.store.get_signing_key(firmar("nuevo"), refrescar=False)
+        self.assertEqual(algorithms, ["RS256"])
+
+    async def test_peticiones_concurrentes_comparten_una_descarga(self):
+        with patch.object(self.store, "_descargar", side_effect=self.descargar("nuevo")):
+            await asyncio.gather(*[self.store.asegurar_clave(firmar("nuevo")) for _ in range(5)])
+        self.assertEqual(len(self.descargas), 1)
+
+    async def test_refresco_limitado_por_intervalo(self):
+        with patch.object(self.store, "_descargar", side_effect=self.descargar("a")):
+            await self.store.asegurar_clave(firmar("b"))
+            await self.store.asegurar_clave(firmar("c"))
+        self.assertEqual(len(self.descargas), 1)
+
+    def test_sin_refrescar_no_descarga(self):
+        with patch.object(self.store, "_descargar") as descargar:
+            with self.assertRaises(jwt.InvalidTokenError):
+                self.store.get_signing_key(firmar("desconocido"), refrescar=False)
+        descargar.assert_not_called()
+
+    def test_hs256_sin_secreto_avisa_una_vez(self):
+        token = jwt.encode({"sub": "u1"}, "secreto", algorithm="HS256")
+        with self.assertLogs("core.authentication.supabase_keys", "WARNING") as logs:
+            for _ in range(2):
+                with self.assertRaises(SupabaseKeysUnavailable):
+                    self.store.get_signing_key(token)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("SUPABASE_JWT_SECRET", logs.output[0])
@@ -0,0 +1,29 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.utils import tokens
+
+
+class ContarTokensTests(SimpleTestCase):
+    def setUp(self):
+        estado = (tokens._encoding, tokens._cargada, tokens._hilo)
+        self.addCleanup(self.restaurar, estado)
+        tokens._encoding, tokens._cargada, tokens._hilo = None, False, None
+
+    def restaurar(self, estado):
+        tokens._encoding, tokens._cargada, tokens._hilo = estado
+
+    def test_heuristica_mientras_carga_en_segundo_plano(self):
+        with patch("core.utils.tokens.Thread") as hilo:
+            self.assertEqual(tokens.contar_tokens("x" * 40), 11)
+            self.assertEqual(tokens.contar_tokens("x" * 8), 3)
+        hilo.assert_called_once()
+        hilo.return_value.start.assert_called_once()
+
+    def test_sin_tiktoken_no_reintenta(self):
+        with patch.dict("sys.modules", {"tiktoken": None}), self.assertLogs("core.utils.tokens", "WARNING"):
+            tokens.cargar_encoding()
+        with patch("core.utils.tokens.Thread") as hilo:
+            self.assertEqual(tokens.contar_tokens("x" * 8), 3)
+        hilo.assert_not_called()
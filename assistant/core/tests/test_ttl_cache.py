@@ -0,0 +1,58 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.utils.ttl_cache import AsyncTTLCache, TTLCache
+
+
+class TTLCacheTests(SimpleTestCase):
+    def test_expira_y_conserva_el_valor_vencido(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+
+        with patch("core.utils.ttl_cache.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.get_stale("a"), 1)
+
+    def test_lru_desaloja_el_menos_usado(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+
+class AsyncTTLCacheTests(SimpleTestCase):
+    async def test_single_flight(self):
+        cache = AsyncTTLCache(ttl=60)
+        llamadas = 0
+
+        async def fetcher():
+            nonlocal llamadas
+            llamadas += 1
+            await asyncio.sleep(0.01)
+            return "valor"
+
+        valores = await asyncio.gather(*[cache.get_or_fetch("k", fetcher) for _ in range(10)])
+        self.assertEqual(valores, ["valor"] * 10)
+        self.assertEqual(llamadas, 1)
+        self.assertEqual(await cache.get_or_fetch("k", fetcher), "valor")
+        self.assertEqual(llamadas, 1)
+
+    async def test_valor_vencido_si_el_origen_falla(self):
+        cache = AsyncTTLCache(ttl=60)
+        cache.set("k", "viejo", ttl=0)
+
+        async def falla():
+            raise ConnectionError("API UBE caída")
+
+        self.assertEqual(await cache.get_or_fetch("k", falla), "viejo")
+        self.assertEqual(cache.get_stats()["stale_hits"], 1)
+        with self.assertRaises(ConnectionError):
+            await cache.get_or_fetch("otra", falla)
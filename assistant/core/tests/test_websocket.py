@@ -0,0 +1,84 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from django.test import SimpleTestCase
+
+from assistant.websocket import CIERRE_NO_ENCONTRADO, ChatSocket
+from core.authentication.backend_auth import AsyncBackendTokenAuthentication, SimpleUser, verification_cache
+
+
+class Conexion:
+    """Extremo de prueba del protocolo ASGI websocket"""
+
+    def __init__(self):
+        self.entrada = asyncio.Queue()
+        self.salida = []
+
+    async def receive(self):
+        return await self.entrada.get()
+
+    async def send(self, evento):
+        self.salida.append(evento)
+
+    def frame(self, datos: dict):
+        self.entrada.put_nowait({"type": "websocket.receive", "text": json.dumps(datos)})
+
+    def enviados(self) -> list[dict]:
+        return [json.loads(e["text"]) for e in self.salida if e["type"] == "websocket.send"]
+
+    def cierres(self) -> list[int]:
+        return [e["code"] for e in self.salida if e["type"] == "websocket.close"]
+
+
+async def eventos_agente(**kwargs):
+    yield "token", {"text": "Hola"}
+    yield "done", {"respuesta": "Hola", "category": "faq"}
+
+
+class ChatSocketTests(SimpleTestCase):
+    def setUp(self):
+        verification_cache.clear()
+        self.user = SimpleUser({"id": "7", "username": "ana"})
+        self.chat = SimpleNamespace(id=10, user_id="7")
+
+    async def conversar(self, conexion: Conexion, socket: ChatSocket):
+        tarea = asyncio.create_task(socket.run(conexion.receive))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if any(e.get("type") == "done" for e in conexion.enviados()) or socket.cerrado:
+                break
+        conexion.entrada.put_nowait({"type": "websocket.disconnect"})
+        await tarea
+
+    async def test_token_ube_se_revalida_sin_doble_bearer(self):
+        conexion = Conexion()
+        socket = ChatSocket(conexion.send)
+        conexion.frame({"type": "auth", "token": "Bearer abc", "provider": "web"})
+        conexion.frame({"type": "message", "message": "hola"})
+
+        ube = AsyncMock(return_value=(self.user, "Bearer abc"))
+        stream = patch("assistant.websocket.stream_message", side_effect=eventos_agente)
+        with patch.object(AsyncBackendTokenAuthentication, "aauthenticate_ube", ube), \
+                patch("assistant.websocket.obtener_chat", AsyncMock(return_value=(self.chat, object()))), \
+                patch("assistant.websocket.apersist_turn", AsyncMock()), \
+                stream as stream_message:
+            await self.conversar(conexion, socket)
+
+        ube.assert_awaited_once_with("abc")
+        self.assertEqual(stream_message.call_args.kwargs["token"], "Bearer abc")
+        self.assertEqual([e["type"] for e in conexion.enviados()], ["ready", "token", "done"])
+        self.assertEqual(conexion.cierres(), [])
+
+    async def test_chat_id_invalido_cierra_la_conexion(self):
+        conexion = Conexion()
+        socket = ChatSocket(conexion.send)
+        conexion.frame({"type": "auth", "token": "abc", "provider": "web", "chat_id": "xyz"})
+
+        with patch("assistant.websocket.authenticator.authenticate_token", AsyncMock(return_value=(self.user, "Bearer abc"))), \
+                patch("assistant.websocket.obtener_chat", AsyncMock()) as obtener_chat:
+            await self.conversar(conexion, socket)
+
+        obtener_chat.assert_not_awaited()
+        self.assertEqual(conexion.cierres(), [CIERRE_NO_ENCONTRADO])
@@ -0,0 +1,135 @@
+"""
+Índice difuso de carreras para resolver nombre -> id sin consultar al LLM.
+
+Combina similitud de trigramas por palabra (tolera errores de tipeo y
+tildes) con similitud de trigramas del nombre completo (desempata entre
+"Derecho" y "Maestría en Derecho Procesal").
+"""
+from typing import List, NamedTuple
+
+from core.utils.text_utils import normalizar_texto
+from schemas.ventas.carreras import CarrerasModel
+
+# Palabras que no aportan a distinguir una carrera
+STOPWORDS = {"de", "del", "la", "las", "el", "los", "en", "y", "e", "a", "carrera", "carreras", "programa"}
+
+# Abreviaturas y formas coloquiales -> término usado en el catálogo (ya normalizados)
+SINONIMOS = {
+    "psico": "psicologia",
+    "fisio": "fisioterapia",
+    "odonto": "odontologia",
+    "nutri": "nutricion",
+    "conta": "contabilidad",
+    "admin": "administracion",
+    "abogacia": "derecho",
+    "leyes": "derecho",
+    "enfermera": "enfermeria",
+    "enfermero": "enfermeria",
+    "sistemas": "software",
+    "informatica": "software",
+    "ti": "tecnologias informacion",
+    "master": "maestria",
+    "magister": "maestria",
+}
+
+# Puntaje mínimo y ventaja sobre el segundo candidato para aceptar sin LLM
+SCORE_MINIMO = 0.6
+MARGEN_MINIMO = 0.1
+# Puntaje mínimo para enviar un candidato al LLM cuando hay ambigüedad
+SCORE_CANDIDATO = 0.3
+
+
+class CarreraMatch(NamedTuple):
+    id: int
+    nombre: str
+    score: float
+
+
+def _trigramas(texto: str) -> frozenset:
+    texto = f"  {texto} "
+    return frozenset(texto[i:i + 3] for i in range(len(texto) - 2))
+
+
+def _dice(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def _tokens(texto: str) -> list[str]:
+    tokens = []
+    for token in normalizar_texto(texto).split():
+        if token in STOPWORDS:
+            continue
+        tokens.extend(SINONIMOS.get(token, token).split())
+    return tokens
+
+
+class _Entrada:
+    __slots__ = ("id", "nombre", "trigramas", "tokens")
+
+    def __init__(self, id: int, nombre: str):
+        tokens = _tokens(nombre)
+        self.id = id
+        self.nombre = nombre
+        self.trigramas = _trigramas(" ".join(tokens))
+        self.tokens = [_trigramas(token) for token in tokens]
+
+
+class CarrerasIndex:
+    """Índice en memoria del catálogo; se reconstruye cuando el catálogo cambia"""
+
+    def __init__(self, carreras: List[CarrerasModel]):
+        self._entradas = [
+            _Entrada(carrera.id, carrera.nombre)
+            for tipo_carrera in carreras
+            for area in tipo_carrera.areas
+            for carrera in area.carreras
+        ]
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    @property
+    def catalogo(self) -> dict[int, str]:
+        """Mapa id -> nombre de todas las carreras"""
+        return {entrada.id: entrada.nombre for entrada in self._entradas}
+
+    def _score(self, tokens: list[frozenset], trigramas: frozenset, entrada: _Entrada) -> float:
+        if not tokens or not entrada.tokens:
+            return 0.0
+        por_token = sum(
+            max(_dice(token, token_carrera) for token_carrera in entrada.tokens)
+            for token in tokens
+        ) / len(tokens)
+        return 0.6 * por_token + 0.4 * _dice(trigramas, entrada.trigramas)
+
+    def search(self, nombre: str, limit: int = 5) -> list[CarreraMatch]:
+        """Retorna las `limit` carreras más parecidas a `nombre`, de mayor a menor puntaje"""
+        tokens_query = _tokens(nombre)
+        tokens = [_trigramas(token) for token in tokens_query]
+        trigramas = _trigramas(" ".join(tokens_query))
+
+        matches = [
+            CarreraMatch(entrada.id, entrada.nombre, self._score(tokens, trigramas, entrada))
+            for entrada in self._entradas
+        ]
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches[:limit]
+
+    def resolve(self, nombre: str) -> tuple[CarreraMatch | None, list[CarreraMatch]]:
+        """
+        Retorna (match, candidatos).
+        `match` es None cuando el resultado es ambiguo; en ese caso `candidatos`
+        contiene las opciones plausibles para desambiguar con el LLM.
+        """
+        matches = self.search(nombre, limit=10)
+        if not matches:
+            return None, []
+
+        mejor = matches[0]
+        segundo = matches[1].score if len(matches) > 1 else 0.0
+        if mejor.score >= SCORE_MINIMO and mejor.score - segundo >= MARGEN_MINIMO:
+            return mejor, [mejor]
+
+        return None, [match for match in matches if match.score >= SCORE_CANDIDATO]
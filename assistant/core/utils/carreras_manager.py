@@ -1,15 +1,30 @@
-from datetime import datetime, timedelta
 from threading import Lock
+import asyncio
 import logging
+import random
+import time
 from typing import List
 
+from django.conf import settings
+
 from core.services.ventas_service import fetch_carreras
+from core.utils.carreras_index import CarrerasIndex
 from schemas.ventas.carreras import CarrerasModel
 
 logger = logging.getLogger(__name__)
 
+# Espera (segundos) antes de reintentar una actualización fallida
+REINTENTO_REFRESH = 60
+
+
 class CarrerasManager:
-    """Manager thread-safe con caché"""
+    """
+    Manager singleton con caché stale-while-revalidate del catálogo.
+
+    El catálogo en caché se sirve de inmediato; cuando se acerca su
+    vencimiento (TTL menos un jitter aleatorio, para que los workers no
+    actualicen a la vez) una única tarea en segundo plano lo actualiza.
+    """
     _instance = None
     _lock = Lock()
 
@@ -19,29 +34,54 @@ class CarrerasManager:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
                     cls._instance._carreras = None
+                    cls._instance._index = None
                     cls._instance._last_fetch = None
-                    cls._instance._cache_duration = timedelta(hours=1)
+                    cls._instance._refresh_at = 0.0
+                    cls._instance._refresh_task = None
+                    cls._instance._cache_duration = getattr(settings, "CARRERAS_CACHE_TTL", 3600)
+                    cls._instance._refresh_jitter = getattr(settings, "CARRERAS_REFRESH_JITTER", 0.1)
         return cls._instance
 
     async def get_carreras(self) -> List[CarrerasModel]:
-        """Obtiene carreras con caché de 1 hora"""
-        now = datetime.now()
-
-        # Cache hit
-        if self._carreras and self._last_fetch:
-            if now - self._last_fetch < self._cache_duration:
-                return self._carreras
-
-        with self._lock:
-            try:
-                self._carreras = await fetch_carreras()
-                self._last_fetch = now
-                logger.info("Carreras cache actualizado")
-            except Exception as e:
-                logger.error(f"Error fetching carreras: {e}")
-                if self._carreras:
-                    logger.warning("Usando cache antiguo de carreras")
-                    return self._carreras
-                raise
-
-        return self._carreras
\ No newline at end of file
+        """Obtiene carreras; solo espera al origen si aún no hay catálogo en caché"""
+        if self._carreras is None:
+            await asyncio.shield(self._get_refresh_task())
+            return self._carreras
+
+        if time.monotonic() >= self._refresh_at:
+            self._get_refresh_task()
+
+        return self._carreras
+
+    def _get_refresh_task(self) -> asyncio.Task:
+        """Retorna la actualización en curso o inicia una nueva (single-flight)"""
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._refresh())
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._refresh_task = task
+        return task
+
+    async def _refresh(self) -> None:
+        try:
+            carreras = await fetch_carreras()
+        except Exception as e:
+            logger.error(f"Error fetching carreras: {e}")
+            self._refresh_at = time.monotonic() + REINTENTO_REFRESH
+            if self._carreras:
+                logger.warning("Usando cache antiguo de carreras")
+                return
+            raise
+
+        self._carreras = carreras
+        self._index = CarrerasIndex(carreras)
+        self._last_fetch = time.monotonic()
+        jitter = random.uniform(0, self._refresh_jitter)
+        self._refresh_at = self._last_fetch + self._cache_duration * (1 - jitter)
+        logger.info("Carreras cache actualizado")
+
+    @property
+    def index(self) -> CarrerasIndex | None:
+        """Índice difuso del catálogo actual (se reconstruye en cada actualización)"""
+        return self._index
@@ -3,8 +3,18 @@ Utilidad para crear argumentos de cliente HTTP para ChatGoogleGenerativeAI.
 Permite desactivar la verificación SSL cuando se está detrás de un proxy
 corporativo con certificado autofirmado (CERTIFICATE_VERIFY_FAILED).
 """
+import asyncio
 import ssl
+import weakref
+
+import httpx
 from django.conf import settings
+from openai import AsyncOpenAI
+
+GEMINI_OPENAI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+
+# Un cliente por event loop: las conexiones de httpx no pueden compartirse entre loops
+_openai_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
 
 
 def get_gemini_client_args():
@@ -19,3 +29,35 @@ def get_gemini_client_args():
     ctx.check_hostname = False
     ctx.verify_mode = ssl.CERT_NONE
     return {"verify": ctx}
+
+
+def get_gemini_openai_client() -> AsyncOpenAI:
+    """
+    Retorna el cliente AsyncOpenAI compartido contra el endpoint compatible
+    con OpenAI de Gemini, con conexiones reutilizables y timeout acotado.
+    Debe llamarse desde una corrutina.
+    """
+    loop = asyncio.get_running_loop()
+    client = _openai_clients.get(loop)
+    if client is None:
+        timeout = getattr(settings, "GEMINI_TIMEOUT", 15)
+        client = AsyncOpenAI(
+            base_url=GEMINI_OPENAI_BASE_URL,
+            api_key=settings.GEMINI_API_KEY,
+            timeout=timeout,
+            max_retries=1,
+            http_client=httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                **get_gemini_client_args(),
+            ),
+        )
+        _openai_clients[loop] = client
+    return client
+
+
+async def close_gemini_openai_client() -> None:
+    """Cierra el cliente AsyncOpenAI del event loop actual, si existe"""
+    client = _openai_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
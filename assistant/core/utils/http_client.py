@@ -0,0 +1,60 @@
+"""
+Cliente HTTP compartido para la API UBE.
+
+Reutiliza conexiones (keep-alive, HTTP/2 si `h2` está instalado) entre
+peticiones en lugar de abrir un `httpx.AsyncClient` por llamada. Se crea en
+el arranque del servidor ASGI y se cierra en el apagado (ver
+`assistant/lifespan.py`); si se usa fuera de ese ciclo se crea bajo demanda.
+"""
+import asyncio
+import importlib.util
+import logging
+import weakref
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Un cliente por event loop: las conexiones de httpx no pueden compartirse entre loops
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+HTTP2_DISPONIBLE = importlib.util.find_spec("h2") is not None
+
+
+def _crear_cliente() -> httpx.AsyncClient:
+    http2 = getattr(settings, "API_UBE_HTTP2", True) and HTTP2_DISPONIBLE
+    logger.info(f"Cliente HTTP API UBE creado (http2={http2})")
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(
+            getattr(settings, "API_UBE_TIMEOUT", 10),
+            connect=getattr(settings, "API_UBE_CONNECT_TIMEOUT", 5),
+        ),
+        limits=httpx.Limits(
+            max_connections=getattr(settings, "API_UBE_MAX_CONNECTIONS", 50),
+            max_keepalive_connections=getattr(settings, "API_UBE_MAX_KEEPALIVE", 20),
+            keepalive_expiry=30,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Retorna el cliente compartido del event loop actual.
+    Debe llamarse desde una corrutina.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _crear_cliente()
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Cierra el cliente del event loop actual, si existe"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("Cliente HTTP API UBE cerrado")
@@ -0,0 +1,433 @@
+"""
+Backends de almacenamiento de la memoria de conversación.
+
+Cada chat se guarda como una lista compacta de registros `(rol, texto)`
+(rol: "h" humano, "a" IA, "s" sistema), serializable en JSON, en lugar de
+objetos de LangChain. Así cualquier worker puede reconstruir el historial:
+
+- `LocalMemoryBackend`: diccionario en el proceso (un solo worker).
+- `CacheMemoryBackend`: cualquier backend de `django.core.cache` (Redis,
+  tabla de base de datos, memcached), compartido entre workers y reinicios.
+"""
+from collections import OrderedDict
+from datetime import timedelta
+from threading import Event, Lock, Thread
+from typing import Awaitable, Callable, Sequence
+import asyncio
+import logging
+import sys
+import time
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from core.utils.tokens import contar_tokens
+
+logger = logging.getLogger(__name__)
+
+Registro = tuple[str, str]
+
+ROLES = {"human": "h", "ai": "a", "system": "s"}
+CLASES = {"h": HumanMessage, "a": AIMessage, "s": SystemMessage}
+# Registro con el resumen acumulado de los turnos antiguos; siempre es el primero
+ROL_RESUMEN = "r"
+
+
+def to_records(messages: Sequence[BaseMessage]) -> list[Registro]:
+    registros = []
+    for message in messages:
+        rol = ROLES.get(message.type)
+        if rol is None:
+            logger.warning(f"Mensaje de tipo {message.type} no se guarda en memoria")
+            continue
+        registros.append((rol, message.content if isinstance(message.content, str) else str(message.content)))
+    return registros
+
+
+def from_records(registros: Sequence[Registro]) -> list[BaseMessage]:
+    return [
+        SystemMessage(content=f"Resumen de la conversación anterior: {texto}")
+        if rol == ROL_RESUMEN else CLASES[rol](content=texto)
+        for rol, texto in registros
+    ]
+
+
+def records_from_history(filas: Sequence[tuple[bool, str]]) -> list[Registro]:
+    """Registros a partir de filas (from_ai, message) de ChatHistory"""
+    return [("a" if from_ai else "h", message) for from_ai, message in filas]
+
+
+class MemoryBackend:
+    """Interfaz de almacenamiento: registros por chat_id"""
+
+    def load(self, chat_id: int) -> list[Registro] | None:
+        raise NotImplementedError
+
+    def save(self, chat_id: int, registros: list[Registro]) -> None:
+        raise NotImplementedError
+
+    def delete(self, chat_id: int) -> None:
+        raise NotImplementedError
+
+    def size(self) -> int | None:
+        """Chats guardados; None si el backend no puede contarlos"""
+        raise NotImplementedError
+
+    def get_stats(self) -> dict:
+        return {"chats": self.size()}
+
+    def start(self) -> None:
+        """Tareas de fondo del backend, si las tiene"""
+
+    def stop(self) -> None:
+        pass
+
+    async def aload(self, chat_id: int) -> list[Registro] | None:
+        return self.load(chat_id)
+
+    async def asave(self, chat_id: int, registros: list[Registro]) -> None:
+        self.save(chat_id, registros)
+
+    async def adelete(self, chat_id: int) -> None:
+        self.delete(chat_id)
+
+
+class MensajeCompacto:
+    """Registro residente: rol y texto en UTF-8, comprimido con zlib si es largo"""
+    __slots__ = ("rol", "datos", "comprimido")
+
+    def __init__(self, rol: str, texto: str, umbral_compresion: int | None = None):
+        datos = texto.encode()
+        comprimido = False
+        if umbral_compresion and len(datos) >= umbral_compresion:
+            datos_z = zlib.compress(datos)
+            if len(datos_z) < len(datos):
+                datos, comprimido = datos_z, True
+        self.rol = rol
+        self.datos = datos
+        self.comprimido = comprimido
+
+    def registro(self) -> Registro:
+        datos = zlib.decompress(self.datos) if self.comprimido else self.datos
+        return (self.rol, datos.decode())
+
+    def tamano(self) -> int:
+        """Bytes residentes aproximados (objeto + buffer)"""
+        return sys.getsizeof(self) + sys.getsizeof(self.datos)
+
+
+class LocalMemoryBackend(MemoryBackend):
+    """
+    Memoria en el proceso: LRU acotada a `max_chats` y a `max_bytes` entre
+    todos los chats, con TTL por inactividad.
+
+    El OrderedDict se mantiene en orden de último acceso, así que consultar,
+    guardar y desalojar son O(1) y los chats vencidos quedan al inicio: el
+    barrido periódico (hilo en segundo plano) solo recorre los que expiraron.
+    Los mensajes se guardan como `MensajeCompacto`; los mensajes de LangChain
+    se crean recién al invocar al agente.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta,
+        max_chats: int,
+        sweep_interval: float = 60,
+        max_bytes: int | None = None,
+        compress_threshold: int | None = 512,
+    ):
+        self._registros = OrderedDict()  # chat_id -> (ultimo_acceso, mensajes, bytes)
+        self._lock = Lock()
+        self.ttl = ttl.total_seconds()
+        self.max_chats = max_chats
+        self.max_bytes = max_bytes
+        self.compress_threshold = compress_threshold
+        self.sweep_interval = sweep_interval
+        self.resident_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._stop = Event()
+        self._thread = None
+
+    def load(self, chat_id: int) -> list[Registro] | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._registros.get(chat_id)
+            if entry is None:
+                return None
+            if now - entry[0] > self.ttl:
+                self._quitar(chat_id)
+                self.expirations += 1
+                return None
+            # Actualizar timestamp de acceso
+            self._registros[chat_id] = (now, entry[1], entry[2])
+            self._registros.move_to_end(chat_id)
+            mensajes = entry[1]
+        return [mensaje.registro() for mensaje in mensajes]
+
+    def save(self, chat_id: int, registros: list[Registro]) -> None:
+        self.start()
+        mensajes = tuple(MensajeCompacto(rol, texto, self.compress_threshold) for rol, texto in registros)
+        tamano = sum(mensaje.tamano() for mensaje in mensajes)
+        with self._lock:
+            self._quitar(chat_id)
+            self._registros[chat_id] = (time.monotonic(), mensajes, tamano)
+            self.resident_bytes += tamano
+            # El chat recién guardado nunca se desaloja, aunque supere el presupuesto solo
+            while len(self._registros) > 1 and (
+                len(self._registros) > self.max_chats
+                or (self.max_bytes and self.resident_bytes > self.max_bytes)
+            ):
+                evicted = next(iter(self._registros))
+                self._quitar(evicted)
+                self.evictions += 1
+                logger.info(f"Memoria desalojada por límite: chat_id {evicted}")
+
+    def _quitar(self, chat_id: int) -> None:
+        """Elimina el chat y descuenta sus bytes; requiere tener el lock"""
+        entry = self._registros.pop(chat_id, None)
+        if entry is not None:
+            self.resident_bytes -= entry[2]
+
+    def delete(self, chat_id: int) -> None:
+        with self._lock:
+            self._quitar(chat_id)
+
+    def size(self) -> int:
+        return len(self._registros)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "chats": len(self._registros),
+                "max_chats": self.max_chats,
+                "resident_bytes": self.resident_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def sweep(self) -> int:
+        """Elimina las memorias vencidas; retorna cuántas eliminó"""
+        limite = time.monotonic() - self.ttl
+        eliminadas = 0
+        with self._lock:
+            while self._registros:
+                chat_id, (ultimo_acceso, _, _) = next(iter(self._registros.items()))
+                if ultimo_acceso >= limite:
+                    break
+                self._quitar(chat_id)
+                eliminadas += 1
+            self.expirations += eliminadas
+        if eliminadas:
+            logger.info(f"🗑️ {eliminadas} memorias expiradas eliminadas")
+        return eliminadas
+
+    def start(self) -> None:
+        """Inicia el barrido periódico en segundo plano (una sola vez)"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._sweep_loop, name="chat-memory-sweep", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+                logger.info(f"Memoria local: {len(self._registros)} chats, {self.resident_bytes} bytes residentes")
+            except Exception as e:
+                logger.error(f"Error barriendo memorias: {e}", exc_info=True)
+
+
+class CacheMemoryBackend(MemoryBackend):
+    """
+    Memoria en un alias de `CACHES`; el TTL se renueva en cada escritura.
+    La caché no expone cuántas claves tiene, así que `size()` retorna None.
+    """
+
+    def __init__(self, alias: str, ttl: timedelta, key_prefix: str = "chat_memory"):
+        self.cache = caches[alias]
+        self.timeout = int(ttl.total_seconds())
+        self.key_prefix = key_prefix
+
+    def _key(self, chat_id: int) -> str:
+        return f"{self.key_prefix}:{chat_id}"
+
+    def load(self, chat_id: int) -> list[Registro] | None:
+        registros = self.cache.get(self._key(chat_id))
+        return [tuple(r) for r in registros] if registros is not None else None
+
+    def save(self, chat_id: int, registros: list[Registro]) -> None:
+        self.cache.set(self._key(chat_id), [list(r) for r in registros], self.timeout)
+
+    def delete(self, chat_id: int) -> None:
+        self.cache.delete(self._key(chat_id))
+
+    def size(self) -> None:
+        return None
+
+    async def aload(self, chat_id: int) -> list[Registro] | None:
+        registros = await self.cache.aget(self._key(chat_id))
+        return [tuple(r) for r in registros] if registros is not None else None
+
+    async def asave(self, chat_id: int, registros: list[Registro]) -> None:
+        await self.cache.aset(self._key(chat_id), [list(r) for r in registros], self.timeout)
+
+    async def adelete(self, chat_id: int) -> None:
+        await self.cache.adelete(self._key(chat_id))
+
+
+class BackendChatMessageHistory(BaseChatMessageHistory):
+    """
+    Historial de LangChain que lee y escribe los registros de un chat en un backend.
+
+    Si el backend no tiene el chat (reinicio, TTL vencido u otro worker sin
+    caché compartida), se rehidrata con los últimos `window` mensajes que
+    retorna `cargar` / `acargar`. El agente ve como máximo `window` mensajes
+    y el backend guarda como máximo `max_messages`.
+
+    Con `token_budget`, el agente solo ve los mensajes recientes que caben en
+    el presupuesto (más el resumen, si existe). Si además hay `resumidor`, tras
+    cada turno una tarea de fondo condensa los mensajes que quedaron fuera en
+    el registro de resumen, así el contexto no crece con la conversación.
+    """
+
+    # Chats con un resumen en curso en este proceso (evita resúmenes duplicados)
+    _resumiendo: set[int] = set()
+    _tareas: set[asyncio.Task] = set()
+
+    def __init__(
+        self,
+        chat_id: int,
+        backend: MemoryBackend,
+        window: int,
+        max_messages: int,
+        cargar: Callable[[int, int], list[tuple[bool, str]]] | None = None,
+        acargar: Callable[[int, int], Awaitable[list[tuple[bool, str]]]] | None = None,
+        token_budget: int | None = None,
+        resumidor: Callable[[str | None, list[Registro]], Awaitable[str]] | None = None,
+    ):
+        self.chat_id = chat_id
+        self.backend = backend
+        self.window = window
+        self.max_messages = max(max_messages, window)
+        self.cargar = cargar
+        self.acargar = acargar
+        self.token_budget = token_budget
+        self.resumidor = resumidor
+
+    def _registros(self) -> list[Registro]:
+        registros = self.backend.load(self.chat_id)
+        if registros is None and self.cargar is not None:
+            registros = records_from_history(self.cargar(self.chat_id, self.window))
+            self.backend.save(self.chat_id, registros)
+            logger.info(f"♻️ Memoria rehidratada: chat_id {self.chat_id} ({len(registros)} mensajes)")
+        return registros or []
+
+    async def _aregistros(self) -> list[Registro]:
+        registros = await self.backend.aload(self.chat_id)
+        if registros is None and self.acargar is not None:
+            registros = records_from_history(await self.acargar(self.chat_id, self.window))
+            await self.backend.asave(self.chat_id, registros)
+            logger.info(f"♻️ Memoria rehidratada: chat_id {self.chat_id} ({len(registros)} mensajes)")
+        return registros or []
+
+    def _dividir(self, registros: list[Registro]) -> tuple[Registro | None, list[Registro], list[Registro]]:
+        """Retorna (resumen, antiguos, visibles): visibles caben en la ventana y el presupuesto"""
+        resumen = registros[0] if registros and registros[0][0] == ROL_RESUMEN else None
+        mensajes = registros[1:] if resumen else registros
+        visibles = mensajes[-self.window:]
+
+        if self.token_budget:
+            total = contar_tokens(resumen[1]) if resumen else 0
+            corte = len(visibles)
+            # Desde el más reciente hacia atrás; el último mensaje siempre se incluye
+            while corte > 0:
+                total += contar_tokens(visibles[corte - 1][1])
+                if total > self.token_budget and corte < len(visibles):
+                    break
+                corte -= 1
+            visibles = visibles[corte:]
+
+        return resumen, mensajes[:len(mensajes) - len(visibles)], visibles
+
+    def _visibles(self, registros: list[Registro]) -> list[Registro]:
+        resumen, _, visibles = self._dividir(registros)
+        return ([resumen] if resumen else []) + visibles
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        return from_records(self._visibles(self._registros()))
+
+    async def aget_messages(self) -> list[BaseMessage]:
+        return from_records(self._visibles(await self._aregistros()))
+
+    def _recortar(self, registros: list[Registro]) -> list[Registro]:
+        if registros and registros[0][0] == ROL_RESUMEN:
+            return registros[:1] + registros[1:][-self.max_messages:]
+        return registros[-self.max_messages:]
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        registros = self._registros() + to_records(messages)
+        self.backend.save(self.chat_id, self._recortar(registros))
+
+    async def aadd_messages(self, messages: Sequence[BaseMessage]) -> None:
+        registros = self._recortar(await self._aregistros() + to_records(messages))
+        await self.backend.asave(self.chat_id, registros)
+
+        if self.resumidor is not None and self._dividir(registros)[1] and self.chat_id not in self._resumiendo:
+            self._resumiendo.add(self.chat_id)
+            tarea = asyncio.get_running_loop().create_task(self._resumir(registros))
+            self._tareas.add(tarea)
+            tarea.add_done_callback(self._tareas.discard)
+
+    async def _resumir(self, registros: list[Registro]) -> None:
+        """Condensa los mensajes antiguos en el resumen (tarea de fondo)"""
+        try:
+            resumen, antiguos, visibles = self._dividir(registros)
+            nuevo = await self.resumidor(resumen[1] if resumen else None, antiguos)
+
+            # Solo se reemplaza el prefijo resumido: los turnos agregados mientras
+            # tanto se conservan; si el historial cambió de otra forma, se descarta
+            actuales = await self.backend.aload(self.chat_id)
+            if actuales is None or actuales[:len(registros)] != registros:
+                logger.info(f"Resumen descartado: la memoria del chat {self.chat_id} cambió")
+                return
+            await self.backend.asave(self.chat_id, [(ROL_RESUMEN, nuevo)] + visibles + actuales[len(registros):])
+            logger.info(f"📝 Memoria resumida: chat_id {self.chat_id} ({len(antiguos)} mensajes condensados)")
+        except Exception as e:
+            logger.error(f"Error resumiendo memoria del chat {self.chat_id}: {e}", exc_info=True)
+        finally:
+            self._resumiendo.discard(self.chat_id)
+
+    def clear(self) -> None:
+        self.backend.delete(self.chat_id)
+
+    async def aclear(self) -> None:
+        await self.backend.adelete(self.chat_id)
+
+
+def create_backend(nombre: str, ttl: timedelta, max_chats: int) -> MemoryBackend:
+    """Backend según `CHAT_MEMORY_BACKEND`: `local` o `cache`"""
+    if nombre == "cache":
+        alias = getattr(settings, "CHAT_MEMORY_CACHE_ALIAS", "chat_memory")
+        logger.info(f"Memoria de conversación en caché compartida ({alias})")
+        return CacheMemoryBackend(alias, ttl)
+    if nombre != "local":
+        logger.warning(f"CHAT_MEMORY_BACKEND desconocido: {nombre}; usando memoria local")
+    return LocalMemoryBackend(
+        ttl,
+        max_chats,
+        sweep_interval=getattr(settings, "CHAT_MEMORY_SWEEP_INTERVAL", 60),
+        max_bytes=getattr(settings, "CHAT_MEMORY_MAX_BYTES", None),
+        compress_threshold=getattr(settings, "CHAT_MEMORY_COMPRESS_THRESHOLD", 512),
+    )
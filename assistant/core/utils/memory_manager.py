@@ -1,65 +1,70 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
+from django.conf import settings
 from langchain_classic.memory import ConversationBufferMemory
-from threading import Lock
 import logging
 
+from core.services.chat_service import aultimos_mensajes, ultimos_mensajes
+from core.utils.memory_backends import BackendChatMessageHistory, create_backend
+from core.utils.memory_summary import resumir
+
 
 logger = logging.getLogger(__name__)
 
 class MemoriaManager:
-    """Gestor centralizado de memorias thread-safe con TTL"""
+    """
+    Gestor centralizado de memorias con TTL. Los mensajes viven en un backend
+    intercambiable (`CHAT_MEMORY_BACKEND`): en el proceso o en una caché de
+    Django compartida entre workers.
+    """
 
-    def __init__(self, ttl_hours: int = 24, max_chats: int = 1000):
-        self._memorias = {}
-        self._timestamps = {}
-        self._lock = Lock()
+    def __init__(self, ttl_hours: int = 24, max_chats: int = 1000, backend: str | None = None):
         self.ttl = timedelta(hours=ttl_hours)
         self.max_chats = max_chats
+        self.backend = create_backend(
+            backend or getattr(settings, "CHAT_MEMORY_BACKEND", "local"),
+            ttl=self.ttl,
+            max_chats=max_chats,
+        )
 
-    def get_memory(self, chat_id: int) -> ConversationBufferMemory:
-        """Obtiene o crea memoria para un chat_id, con limpieza automática de expiradas"""
-        self._cleanup_expired()
-
-        with self._lock:
-            if chat_id not in self._memorias:
-                if len(self._memorias) >= self.max_chats:
-                    logger.warning(f"Límite de chats alcanzado ({self.max_chats})")
-
-                self._memorias[chat_id] = ConversationBufferMemory(
-                    memory_key="chat_history",
-                    return_messages=True
-                )
-                self._timestamps[chat_id] = datetime.now()
-                logger.info(f"✅ Memoria creada para chat_id: {chat_id}")
-            else:
-                # Actualizar timestamp de acceso
-                self._timestamps[chat_id] = datetime.now()
+    def get_memory(self, chat_id: int, window: int | None = None) -> ConversationBufferMemory:
+        """
+        Memoria del chat; el historial se lee y escribe en el backend en cada
+        turno y, si no está, se rehidrata desde ChatHistory (últimos `window` mensajes).
+        """
+        return ConversationBufferMemory(
+            chat_memory=BackendChatMessageHistory(
+                chat_id,
+                self.backend,
+                window=window or getattr(settings, "CHAT_MEMORY_WINDOW", 20),
+                max_messages=getattr(settings, "CHAT_MEMORY_MAX_MESSAGES", 100),
+                cargar=ultimos_mensajes,
+                acargar=aultimos_mensajes,
+                **self._opciones_modo(),
+            ),
+            memory_key="chat_history",
+            return_messages=True
+        )
 
-            return self._memorias[chat_id]
-
-    def _cleanup_expired(self) -> None:
-        """Limpia memorias expiradas"""
-        now = datetime.now()
-        with self._lock:
-            expired = [
-                chat_id for chat_id, timestamp in self._timestamps.items()
-                if now - timestamp > self.ttl
-            ]
-            for chat_id in expired:
-                self._memorias.pop(chat_id, None)
-                self._timestamps.pop(chat_id, None)
-                logger.info(f"🗑️ Memoria expirada eliminada: chat_id {chat_id}")
+    def _opciones_modo(self) -> dict:
+        """`CHAT_MEMORY_MODE`: "buffer" (ventana) o "summary" (presupuesto de tokens + resumen)"""
+        if getattr(settings, "CHAT_MEMORY_MODE", "buffer") != "summary":
+            return {}
+        return {
+            "token_budget": getattr(settings, "CHAT_MEMORY_TOKEN_BUDGET", 2000),
+            "resumidor": resumir,
+        }
 
     def clear_memory(self, chat_id: int) -> None:
         """Limpia la memoria de un chat específico"""
-        with self._lock:
-            if chat_id in self._memorias:
-                self._memorias.pop(chat_id)
-                self._timestamps.pop(chat_id)
-                logger.info(f"🗑️ Memoria eliminada: chat_id {chat_id}")
+        self.backend.delete(chat_id)
+        logger.info(f"🗑️ Memoria eliminada: chat_id {chat_id}")
+
+    def get_size(self) -> int | None:
+        """Retorna cantidad de chats en memoria; None si el backend no la conoce"""
+        return self.backend.size()
 
-    def get_size(self) -> int:
-        """Retorna cantidad de chats en memoria"""
-        return len(self._memorias)
+    def get_stats(self) -> dict:
+        """Chats y bytes residentes en este worker, desalojos y expiraciones"""
+        return self.backend.get_stats()
 
-memoria_manager = MemoriaManager(ttl_hours=24, max_chats=500)
+memoria_manager = MemoriaManager(ttl_hours=24, max_chats=getattr(settings, "CHAT_MEMORY_MAX_CHATS", 500))
@@ -0,0 +1,43 @@
+"""
+Resumen acumulado de la memoria de conversación.
+
+Los turnos que ya no caben en el presupuesto de tokens se condensan, junto
+con el resumen anterior, en un único mensaje de sistema. Se ejecuta en una
+tarea de fondo después de responder, nunca mientras el usuario espera.
+"""
+from typing import Sequence
+import logging
+
+from core.utils.gemini_client import get_gemini_openai_client
+
+logger = logging.getLogger(__name__)
+
+ETIQUETAS = {"h": "Usuario", "a": "Asistente", "s": "Contexto"}
+
+PROMPT_RESUMEN = """Eres un asistente que resume conversaciones entre un usuario y el asistente virtual de la UBE.
+
+Actualiza el resumen existente incorporando los nuevos mensajes. Conserva los datos
+útiles para continuar la conversación (nombre del usuario, carrera o trámite de interés,
+datos ya entregados, preguntas pendientes) y omite saludos y listados completos.
+Responde solo con el resumen, en español y en menos de 150 palabras.
+
+Resumen existente:
+{resumen}
+
+Nuevos mensajes:
+{mensajes}"""
+
+
+async def resumir(resumen_previo: str | None, registros: Sequence[tuple[str, str]]) -> str:
+    """Retorna el resumen actualizado con `registros` (rol, texto)"""
+    mensajes = "\n".join(f"{ETIQUETAS.get(rol, rol)}: {texto}" for rol, texto in registros)
+    client = get_gemini_openai_client()
+    response = await client.chat.completions.create(
+        model="gemini-2.0-flash",
+        messages=[{
+            "role": "user",
+            "content": PROMPT_RESUMEN.format(resumen=resumen_previo or "(vacío)", mensajes=mensajes),
+        }],
+        temperature=0.2,
+    )
+    return response.choices[0].message.content.strip()
@@ -0,0 +1,211 @@
+"""
+Métricas en proceso con exposición en formato de texto de Prometheus.
+
+Contadores e histogramas mínimos (un dict y un lock por métrica) para no
+agregar dependencias ni costo apreciable por petición. Cada worker expone
+sus propios valores en `/metrics`; Prometheus los agrega por instancia.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from typing import Iterable
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Segundos: desde caché en memoria hasta respuestas lentas del LLM
+BUCKETS_DEFAULT = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+Muestra = tuple[str, dict, float]  # (nombre, labels, valor)
+
+
+def _escape(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.type = "counter"
+        self._values = {}
+        self._lock = Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> list[Muestra]:
+        with self._lock:
+            return [
+                (self.name, dict(zip(self.labelnames, labels)), value)
+                for labels, value in self._values.items()
+            ]
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=BUCKETS_DEFAULT):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.type = "histogram"
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels -> [conteos por bucket (no acumulados), suma, total]
+        self._lock = Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            estado = self._values.get(labels)
+            if estado is None:
+                estado = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            estado[0][i] += 1
+            estado[1] += value
+            estado[2] += 1
+
+    def samples(self) -> list[Muestra]:
+        with self._lock:
+            copia = [(labels, list(estado[0]), estado[1], estado[2]) for labels, estado in self._values.items()]
+
+        muestras = []
+        for labels, conteos, suma, total in copia:
+            base = dict(zip(self.labelnames, labels))
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float("inf"),), conteos):
+                acumulado += conteo
+                muestras.append((f"{self.name}_bucket", {**base, "le": "+Inf" if limite == float("inf") else repr(limite)}, acumulado))
+            muestras.append((f"{self.name}_sum", base, suma))
+            muestras.append((f"{self.name}_count", base, total))
+        return muestras
+
+
+class Snapshot:
+    """Valores leídos al momento de exponer (estadísticas de cachés, memoria, etc.)"""
+
+    def __init__(self, name: str, help: str, muestras: Iterable[tuple[dict, float]], type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.type = type
+        self._muestras = list(muestras)
+
+    def samples(self) -> list[Muestra]:
+        return [(self.name, labels, value) for labels, value in self._muestras]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=BUCKETS_DEFAULT) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self, extra: Iterable = ()) -> str:
+        """Formato de texto de Prometheus 0.0.4; `extra` agrega métricas calculadas al vuelo"""
+        lineas = []
+        for metric in [*self._metrics, *extra]:
+            lineas.append(f"# HELP {metric.name} {metric.help}")
+            lineas.append(f"# TYPE {metric.name} {metric.type}")
+            for nombre, labels, value in metric.samples():
+                lineas.append(f"{nombre}{_labels(labels)} {value}")
+        return "\n".join(lineas) + "\n"
+
+
+registry = MetricsRegistry()
+
+chat_stage_seconds = registry.histogram(
+    "ube_chat_stage_seconds",
+    "Duración de cada etapa de un turno de chat",
+    ("stage",),
+)
+tool_seconds = registry.histogram(
+    "ube_tool_seconds",
+    "Duración de la ejecución de cada tool (incluye llamadas a la API UBE)",
+    ("tool",),
+)
+llm_seconds = registry.histogram(
+    "ube_llm_seconds",
+    "Duración de cada llamada al modelo dentro de un agente",
+)
+chat_category_total = registry.counter(
+    "ube_chat_category_total",
+    "Mensajes enrutados por categoría",
+    ("category",),
+)
+tool_calls_total = registry.counter(
+    "ube_tool_calls_total",
+    "Ejecuciones de tools por resultado",
+    ("tool", "status"),
+)
+
+
+@contextmanager
+def medir(etapa: str):
+    """Registra la duración del bloque como la etapa `etapa` de un turno"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        chat_stage_seconds.observe(time.perf_counter() - inicio, etapa)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Callback de LangChain que mide tools y llamadas al modelo. Se pasa en la
+    config de cada invocación para que se herede a las ejecuciones hijas.
+    """
+    # Se ejecuta en el mismo hilo/loop que el agente, sin saltos a un executor
+    run_inline = True
+
+    def __init__(self):
+        self._inicios = {}  # run_id -> (tool, inicio)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        nombre = kwargs.get("name") or (serialized or {}).get("name", "desconocida")
+        self._inicios[run_id] = (nombre, time.perf_counter())
+
+    def _fin_tool(self, run_id, status: str) -> None:
+        inicio = self._inicios.pop(run_id, None)
+        if inicio is not None:
+            nombre, t0 = inicio
+            tool_seconds.observe(time.perf_counter() - t0, nombre)
+            tool_calls_total.inc(nombre, status)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._fin_tool(run_id, "ok")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._fin_tool(run_id, "error")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._inicios[run_id] = (None, time.perf_counter())
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._inicios[run_id] = (None, time.perf_counter())
+
+    def _fin_llm(self, run_id) -> None:
+        inicio = self._inicios.pop(run_id, None)
+        if inicio is not None:
+            llm_seconds.observe(time.perf_counter() - inicio[1])
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._fin_llm(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._fin_llm(run_id)
+
+
+metrics_callback = MetricsCallbackHandler()
@@ -0,0 +1,41 @@
+"""
+Paginación por keyset con cursores opacos.
+
+El cursor es la posición del último elemento entregado (p. ej. `{"id": 120}`)
+serializada en JSON y codificada en base64 url-safe; el cliente solo lo
+reenvía. Cada página cuesta lo mismo sin importar cuántas la preceden.
+"""
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(posicion: dict) -> str:
+    data = json.dumps(posicion, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> dict | None:
+    """Retorna la posición codificada en `cursor`, None si no hay cursor"""
+    if not cursor:
+        return None
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        posicion = json.loads(data)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Cursor inválido")
+    if not isinstance(posicion, dict):
+        raise InvalidCursor("Cursor inválido")
+    return posicion
+
+
+def get_page_size(valor, default: int, maximo: int) -> int:
+    """Tamaño de página pedido por el cliente, acotado a [1, maximo]"""
+    try:
+        page_size = int(valor) if valor is not None else default
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, maximo))
@@ -0,0 +1,27 @@
+import re
+import unicodedata
+
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9ñ\s]")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def quitar_acentos(texto: str) -> str:
+    """Elimina tildes y diéresis conservando la ñ"""
+    texto = texto.replace("ñ", "\0").replace("Ñ", "\1")
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return sin_acentos.replace("\0", "ñ").replace("\1", "Ñ")
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza un mensaje para comparaciones: minúsculas, sin acentos,
+    sin signos de puntuación y con espacios colapsados.
+
+    Ejemplo: "¿Qué  CARRERAS tienen?" -> "que carreras tienen"
+    """
+    if not texto:
+        return ""
+    texto = quitar_acentos(texto.lower())
+    texto = _NO_ALFANUMERICO.sub(" ", texto)
+    return _ESPACIOS.sub(" ", texto).strip()
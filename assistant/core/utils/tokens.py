@@ -0,0 +1,51 @@
+"""
+Conteo aproximado de tokens para acotar el contexto enviado al modelo.
+
+Gemini no publica su tokenizador; `cl100k_base` de tiktoken da una
+estimación cercana. Cargar la codificación lee (o descarga la primera vez)
+su archivo BPE, así que nunca se hace en el event loop: el lifespan la
+precarga con `asyncio.to_thread(cargar_encoding)` y, si nadie lo hizo, el
+primer conteo la carga en un hilo de fondo. Mientras no esté lista, o si
+tiktoken no puede cargarla, se usa la heurística de 4 caracteres por token.
+"""
+from threading import Lock, Thread
+import logging
+
+logger = logging.getLogger(__name__)
+
+_encoding = None
+_cargada = False
+_hilo: Thread | None = None
+_lock = Lock()
+
+
+def cargar_encoding() -> None:
+    """Carga la codificación una sola vez (bloqueante)"""
+    global _encoding, _cargada
+    with _lock:
+        if _cargada:
+            return
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"tiktoken no disponible ({e}); se estima 1 token cada 4 caracteres")
+        finally:
+            _cargada = True
+
+
+def _cargar_en_segundo_plano() -> None:
+    global _hilo
+    if _hilo is None:
+        _hilo = Thread(target=cargar_encoding, name="tiktoken-carga", daemon=True)
+        _hilo.start()
+
+
+def contar_tokens(texto: str) -> int:
+    encoding = _encoding
+    if encoding is None:
+        if not _cargada:
+            _cargar_en_segundo_plano()
+        return len(texto) // 4 + 1
+    return len(encoding.encode(texto, disallowed_special=()))
@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Awaitable, Callable
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Caché LRU acotada con expiración por entrada, thread-safe.
+
+    Las entradas vencidas no se eliminan al consultarlas: siguen disponibles
+    mediante `get_stale` hasta que el LRU las desaloje, lo que permite servir
+    datos antiguos cuando el origen falla.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expira_en, valor)
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, default=None):
+        """Retorna el valor vigente de `key` o `default` si no existe o expiró"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def get_stale(self, key, default=None):
+        """Retorna el último valor guardado para `key`, aunque haya expirado"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        expira_en = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expira_en, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> dict:
+        """Contadores de aciertos, fallos y desalojos"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / total if total else 0.0,
+            }
+
+
+class AsyncTTLCache(TTLCache):
+    """
+    TTLCache con carga asíncrona coalescida (single-flight): las peticiones
+    concurrentes por la misma clave esperan una única llamada al origen. Si el
+    origen falla y existe un valor vencido, se retorna ese valor.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, name: str = "cache"):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.name = name
+        self._en_vuelo = {}  # key -> asyncio.Task
+        self._stale_hits = 0
+
+    async def get_or_fetch(self, key, fetcher: Callable[[], Awaitable]):
+        """Retorna el valor de `key`, llamando a `fetcher()` solo si no está vigente"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        loop = asyncio.get_running_loop()
+        task = self._en_vuelo.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch(key, fetcher))
+            self._en_vuelo[key] = task
+            task.add_done_callback(lambda t: self._fin_vuelo(key, t))
+
+        try:
+            # shield: si un solicitante se cancela, la carga sigue para los demás
+            return await asyncio.shield(task)
+        except Exception as e:
+            stale = self.get_stale(key, _MISSING)
+            if stale is _MISSING:
+                raise
+            with self._lock:
+                self._stale_hits += 1
+            logger.warning(f"{self.name}: error obteniendo {key!r} ({e}); usando valor vencido")
+            return stale
+
+    def _fin_vuelo(self, key, task: asyncio.Task) -> None:
+        if self._en_vuelo.get(key) is task:
+            self._en_vuelo.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # evita "Task exception was never retrieved" si nadie la esperó
+
+    async def _fetch(self, key, fetcher: Callable[[], Awaitable]):
+        value = await fetcher()
+        self.set(key, value)
+        return value
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats["stale_hits"] = self._stale_hits
+        stats["in_flight"] = len(self._en_vuelo)
+        return stats
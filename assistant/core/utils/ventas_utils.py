@@ -1,28 +1,46 @@
 from typing import List
+import logging
 
-from openai import OpenAI
 import json
 
-from assistant.settings import GEMINI_API_KEY
+from core.utils.carreras_index import SCORE_MINIMO, CarrerasIndex
+from core.utils.gemini_client import get_gemini_openai_client
 from schemas.ventas.carreras import CarrerasModel
 
+logger = logging.getLogger(__name__)
 
-def get_id_by_name(carreras: List[CarrerasModel], mensaje: str):
+
+async def get_id_by_name(carreras: List[CarrerasModel], mensaje: str, index: CarrerasIndex | None = None):
     """
-    Extrae el nombre de la carrera de un mensaje y devuelve su ID.
-    El modelo de IA actúa como un clasificador.
+    Extrae el nombre de la carrera de un mensaje y devuelve su ID, o None si
+    no hay coincidencia.
+    Se resuelve con el índice difuso local; el modelo de IA solo se consulta
+    como desempate cuando la coincidencia es ambigua.
     """
+    if index is None:
+        index = CarrerasIndex(carreras)
+    match, candidatos = index.resolve(mensaje)
+    if match:
+        logger.info(f"Carrera resuelta localmente: {match.nombre} (score {match.score:.2f})")
+        return match.id
+
+    # Con candidatos débiles la carrera correcta puede haber quedado fuera:
+    # el modelo elige entre todo el catálogo
+    catalogo = index.catalogo
+    if candidatos and candidatos[0].score >= SCORE_MINIMO:
+        prompts = {candidato.id: candidato.nombre for candidato in candidatos}
+    else:
+        prompts = catalogo
+
+    id_carrera = await _get_id_by_llm(prompts, mensaje)
+    # 0 (sin coincidencia) o un ID inventado se tratan como no encontrada
+    return id_carrera if id_carrera in catalogo else None
+
 
-    client = OpenAI(
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-        api_key=GEMINI_API_KEY,
-    )
+async def _get_id_by_llm(prompts: dict[int, str], mensaje: str):
+    """Pide al modelo de IA que elija el ID de la carrera entre `prompts`"""
 
-    prompts = {}
-    for tipo_carrera in carreras:
-        for area in tipo_carrera.areas:
-            for carrera in area.carreras:
-                prompts[carrera.id] = carrera.nombre
+    client = get_gemini_openai_client()
 
     classifier_prompt = """
     Eres un clasificador de carreras universitarias.
@@ -44,7 +62,7 @@ def get_id_by_name(carreras: List[CarrerasModel], mensaje: str):
     ]
 
     try:
-        classification = client.chat.completions.create(
+        classification = await client.chat.completions.create(
             # model="meta-llama/llama-3.3-70b-instruct",
             model="gemini-2.0-flash",
             messages=messages,
@@ -0,0 +1,63 @@
+import asyncio
+
+from adrf.views import APIView
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView de adrf que autentica en el event loop.
+
+    adrf 0.1.12 ejecuta `initial()` con `sync_to_async` y dentro envuelve los
+    autenticadores asíncronos con `async_to_sync`: dos saltos de hilo por
+    petición. Aquí los autenticadores se esperan directamente y, con el
+    usuario ya resuelto, `initial()` (negociación, permisos y throttling
+    síncronos, sin I/O) corre en el mismo loop.
+    """
+
+    async def perform_async_authentication(self, request) -> None:
+        for authenticator in request.authenticators:
+            try:
+                if asyncio.iscoroutinefunction(authenticator.authenticate):
+                    user_auth_tuple = await authenticator.authenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def async_dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.perform_async_authentication(request)
+            # `perform_authentication` solo lee `request.user`, ya asignado
+            self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -1,65 +1,83 @@
-from adrf.views import APIView
+from core.views.base import AsyncAPIView
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from core.agents.classifier import route_message
-from core.models import Chat, ChatHistory, Provider
-from core.authentication.backend_auth import BackendTokenAuthentication
-from datetime import datetime
-from asgiref.sync import sync_to_async
+from core.agents.classifier import route_message, stream_message
+from core.models import Chat, Provider
+from core.services.chat_service import apersist_turn, obtener_chat
+from core.authentication.backend_auth import AsyncBackendTokenAuthentication
 from core.utils.memory_manager import memoria_manager
+from core.utils.metrics import chat_stage_seconds
+import json
+import time
 
 
-class ChatView(APIView):
-    authentication_classes = [BackendTokenAuthentication]
+async def preparar_chat(user, data) -> tuple[Chat, Provider]:
+    """Obtiene o crea el chat; los mensajes se guardan al terminar el turno"""
+    try:
+        return await obtener_chat(
+            user,
+            data.get("provider"),
+            data.get("chat_id"),
+            first_message=data.get("message")
+        )
+    except Chat.DoesNotExist:
+        raise NotFound("Chat no encontrado o no pertenece a tu cuenta")
+
+
+def evento_sse(evento: str, datos: dict) -> str:
+    return f"event: {evento}\ndata: {json.dumps(datos, ensure_ascii=False, default=str)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Permite negociar `Accept: text/event-stream`. El stream normal es un
+    StreamingHttpResponse y no pasa por aquí; las respuestas de error de DRF
+    (401, 404, ...) se emiten como un único evento `error`.
+    """
+    media_type = "text/event-stream"
+    format = "sse"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return evento_sse("error", data).encode(self.charset)
+
+
+class ChatView(AsyncAPIView):
+    authentication_classes = [AsyncBackendTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     async def post(self, request):
         """Procesa un mensaje manteniendo contexto de conversación"""
+        inicio = time.perf_counter()
         data = request.data
-        user = request.user
         message = data.get("message")
 
-        provider = await sync_to_async(Provider.objects.get)(name=data.get("provider"))
-        chat_id = data.get("chat_id")
+        chat, provider = await preparar_chat(request.user, data)
 
         print(provider.id)
         print(data)
 
-        if chat_id:
-            chat = await sync_to_async(Chat.objects.get)(id=chat_id)
-        else:
-            chat = await sync_to_async(Chat.objects.create)(
-                user_id=str(user.id),
-                provider=provider,
-                created_at=datetime.now()
-            )
-
-        await sync_to_async(ChatHistory.objects.create)(
-            chat=chat,
-            message=message,
-            created_at=datetime.now(),
-            from_ai=False
-        )
-
         # agent_executor = get_router_agent(chat.id)
 
         # category, ai_response = await route_message(chat_id, message, request.auth, provider)
-        category, ai_response = await route_message(
-            chat_id=chat.id,
-            user_message=message,
-            token=request.auth,
-            provider=provider
-        )
-        # agent_executor = get_agent(chat.id)
-        # result = await agent_executor.ainvoke({"input": message})
-        # ai_response = result.get("output", "Ocurrió un error inesperado.")
-
-        await sync_to_async(ChatHistory.objects.create)(
-            chat=chat,
-            message=ai_response,
-            created_at=datetime.now(),
-            from_ai=True
-        )
+        ai_response = None
+        try:
+            category, ai_response = await route_message(
+                chat_id=chat.id,
+                user_message=message,
+                token=request.auth,
+                provider=provider
+            )
+            # agent_executor = get_agent(chat.id)
+            # result = await agent_executor.ainvoke({"input": message})
+            # ai_response = result.get("output", "Ocurrió un error inesperado.")
+        finally:
+            # Si el agente falla o el cliente se desconecta, se guarda solo el mensaje del usuario
+            await apersist_turn(chat, message, ai_response)
 
         # return Response({
         #     "chat_id": chat.id,
@@ -68,9 +86,57 @@ class ChatView(APIView):
 
         print(ai_response)
 
+        chat_stage_seconds.observe(time.perf_counter() - inicio, "turn")
         return Response({
             "chat_id": chat.id,
             "category": category,
             "respuesta": ai_response,
             "contexto_activo": memoria_manager.get_size()
-        })
\ No newline at end of file
+        })
+
+
+class ChatStreamView(AsyncAPIView):
+    """
+    Igual que ChatView, pero responde con Server-Sent Events a medida que el
+    agente genera la respuesta. Eventos: `category`, `tool_start`, `tool_end`,
+    `token` (fragmento de texto) y uno final `done` o `error` con `chat_id`.
+    """
+    authentication_classes = [AsyncBackendTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    async def post(self, request):
+        data = request.data
+        chat, provider = await preparar_chat(request.user, data)
+
+        eventos = self._eventos(chat, data.get("message"), request.auth, provider)
+        response = StreamingHttpResponse(eventos, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # evita el buffering de proxies (nginx)
+        return response
+
+    async def _eventos(self, chat, message, token, provider):
+        inicio = time.perf_counter()
+        guardado = False
+        try:
+            async for evento, datos in stream_message(
+                chat_id=chat.id,
+                user_message=message,
+                token=token,
+                provider=provider
+            ):
+                if evento in ("done", "error"):
+                    # El turno completo se guarda antes de cerrar el stream
+                    guardado = True
+                    await apersist_turn(chat, message, datos["respuesta"])
+                    datos = {
+                        **datos,
+                        "chat_id": chat.id,
+                        "contexto_activo": memoria_manager.get_size(),
+                    }
+                    chat_stage_seconds.observe(time.perf_counter() - inicio, "turn")
+                yield evento_sse(evento, datos)
+        finally:
+            # Excepción del agente o cliente desconectado antes del final
+            if not guardado:
+                await apersist_turn(chat, message, None)
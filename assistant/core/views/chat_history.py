@@ -1,22 +1,47 @@
-from adrf.views import APIView
+from core.views.base import AsyncAPIView
+from django.conf import settings
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from core.authentication.backend_auth import BackendTokenAuthentication
+from core.authentication.backend_auth import AsyncBackendTokenAuthentication
 from core.models import Chat
+from core.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, get_page_size
 from rest_framework.response import Response
 
 
-class ChatHistoryView(APIView):
-    authentication_classes = [BackendTokenAuthentication]
+class ChatHistoryView(AsyncAPIView):
+    """
+    Chats del usuario del más reciente al más antiguo, paginados por keyset
+    sobre `id`: `?page_size=` (acotado) y `?cursor=` con el `next_cursor`
+    de la página anterior.
+    """
+    authentication_classes = [AsyncBackendTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    async def get(self, request):
         user = request.user
-        chats = Chat.objects.filter(user_id=user.id).order_by('-id')
-
-        response = [
-            {
-                'id': x.id,
-                'title': x.title
-            } for x in chats
-        ]
-        return Response(response)
\ No newline at end of file
+
+        try:
+            cursor = decode_cursor(request.query_params.get("cursor"))
+            last_id = int(cursor["id"]) if cursor else None
+        except (InvalidCursor, KeyError, TypeError, ValueError):
+            return Response({"detail": "Cursor inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        page_size = get_page_size(
+            request.query_params.get("page_size"),
+            default=getattr(settings, "CHAT_HISTORY_PAGE_SIZE", 20),
+            maximo=getattr(settings, "CHAT_HISTORY_MAX_PAGE_SIZE", 100),
+        )
+
+        chats = Chat.objects.filter(user_id=str(user.id))
+        if last_id is not None:
+            chats = chats.filter(id__lt=last_id)
+
+        # Una fila extra indica si hay más páginas
+        rows = [x async for x in chats.order_by('-id').values('id', 'title')[:page_size + 1]]
+        results = rows[:page_size]
+        next_cursor = encode_cursor({"id": results[-1]["id"]}) if len(rows) > page_size else None
+
+        return Response({
+            "results": results,
+            "next_cursor": next_cursor,
+        })
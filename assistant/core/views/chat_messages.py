@@ -0,0 +1,125 @@
+from core.views.base import AsyncAPIView
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from core.authentication.backend_auth import AsyncBackendTokenAuthentication
+from core.models import Chat, ChatHistory
+from core.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, get_page_size
+from datetime import datetime
+import hashlib
+
+CAMPOS = ("id", "message", "from_ai", "created_at")
+DIRECCIONES = ("older", "newer")
+
+
+def parse_if_none_match(header: str | None) -> set[str]:
+    if not header:
+        return set()
+    return {etag.strip().removeprefix("W/") for etag in header.split(",")}
+
+
+class ChatMessagesView(AsyncAPIView):
+    """
+    Mensajes de un chat en orden cronológico, paginados por keyset sobre
+    (created_at, id).
+
+    - Sin cursor retorna la página más reciente.
+    - `older_cursor` pide los mensajes anteriores (null si no hay más);
+      `newer_cursor` pide los posteriores y sirve para consultar mensajes nuevos.
+    - `?fields=id,message` limita los campos de cada mensaje.
+    - Responde con ETag; con `If-None-Match` vigente retorna 304 sin leer la página.
+    """
+    authentication_classes = [AsyncBackendTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, chat_id):
+        params = request.query_params
+
+        fields = params.get("fields")
+        fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(CAMPOS)
+        invalidos = set(fields) - set(CAMPOS)
+        if invalidos:
+            return Response(
+                {"detail": f"Campos no soportados: {', '.join(sorted(invalidos))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            cursor = decode_cursor(params.get("cursor"))
+            if cursor:
+                direccion = cursor["dir"]
+                posicion = (datetime.fromisoformat(cursor["created_at"]), int(cursor["id"]))
+                if direccion not in DIRECCIONES:
+                    raise InvalidCursor("Cursor inválido")
+        except (InvalidCursor, KeyError, TypeError, ValueError):
+            return Response({"detail": "Cursor inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        page_size = get_page_size(
+            params.get("page_size"),
+            default=getattr(settings, "CHAT_MESSAGES_PAGE_SIZE", 50),
+            maximo=getattr(settings, "CHAT_MESSAGES_MAX_PAGE_SIZE", 200),
+        )
+
+        # Propiedad del chat y versión de sus mensajes en una sola consulta;
+        # los mensajes solo se agregan, así que (último id, total) identifica el estado
+        estado = await Chat.objects.filter(id=chat_id, user_id=str(request.user.id)).annotate(
+            ultimo=Max("messages__id"),
+            total=Count("messages"),
+        ).values("ultimo", "total").afirst()
+        if estado is None:
+            return Response(
+                {"detail": "Chat no encontrado o no pertenece a tu cuenta"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        version = f"{chat_id}:{estado['ultimo']}:{estado['total']}:{','.join(fields)}:{page_size}:{params.get('cursor', '')}"
+        etag = f'"{hashlib.sha1(version.encode()).hexdigest()}"'
+        if etag in parse_if_none_match(request.headers.get("If-None-Match")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        messages = ChatHistory.objects.filter(chat_id=chat_id)
+        if not cursor or cursor["dir"] == "older":
+            if cursor:
+                created_at, last_id = posicion
+                messages = messages.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id))
+            messages = messages.order_by("-created_at", "-id")
+        else:
+            created_at, last_id = posicion
+            messages = messages.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=last_id))
+            messages = messages.order_by("created_at", "id")
+
+        # Una fila extra indica si hay más mensajes en esa dirección
+        columnas = set(fields) | {"id", "created_at"}
+        rows = [x async for x in messages.values(*columnas)[:page_size + 1]]
+        hay_mas = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if not cursor or cursor["dir"] == "older":
+            rows.reverse()
+            hay_anteriores, hay_posteriores = hay_mas, cursor is not None
+        else:
+            hay_anteriores, hay_posteriores = True, hay_mas
+
+        def cursor_de(row, direccion):
+            return encode_cursor({"dir": direccion, "created_at": row["created_at"].isoformat(), "id": row["id"]})
+
+        if rows:
+            older_cursor = cursor_de(rows[0], "older") if hay_anteriores else None
+            newer_cursor = cursor_de(rows[-1], "newer")
+        else:
+            # Página vacía: se conserva la posición para seguir consultando
+            older_cursor = None
+            newer_cursor = params.get("cursor") if cursor and cursor["dir"] == "newer" else None
+
+        return Response(
+            {
+                "chat_id": chat_id,
+                "results": [{campo: row[campo] for campo in fields} for row in rows],
+                "older_cursor": older_cursor,
+                "newer_cursor": newer_cursor,
+                "has_newer": hay_posteriores,
+            },
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+        )
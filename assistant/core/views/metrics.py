@@ -0,0 +1,85 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+
+from core.agents.classifier import classification_cache
+from core.agents.intent_classifier import intent_classifier
+from core.agents.registry import agent_registry
+from core.authentication.backend_auth import auth_stats, verification_cache
+from core.services.chat_service import provider_cache
+from core.services.ventas_service import detalle_cache, grupos_cache, malla_cache
+from core.utils.memory_manager import memoria_manager
+from core.utils.metrics import Snapshot, registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+CACHES = {
+    "classification": classification_cache,
+    "auth_verification": verification_cache,
+    "provider": provider_cache,
+    "detalle_carrera": detalle_cache,
+    "malla": malla_cache,
+    "grupos": grupos_cache,
+}
+
+
+def estadisticas() -> list[Snapshot]:
+    """Métricas leídas de las cachés y gestores del worker al momento de exponer"""
+    caches = {nombre: cache.get_stats() for nombre, cache in CACHES.items()}
+    intent = intent_classifier.get_stats()
+    auth = auth_stats.get_stats()
+    memoria = memoria_manager.get_stats()
+
+    metricas = [
+        Snapshot("ube_cache_hits_total", "Aciertos por caché",
+                 [({"cache": n}, s["hits"]) for n, s in caches.items()], type="counter"),
+        Snapshot("ube_cache_misses_total", "Fallos por caché",
+                 [({"cache": n}, s["misses"]) for n, s in caches.items()], type="counter"),
+        Snapshot("ube_cache_evictions_total", "Desalojos por caché",
+                 [({"cache": n}, s["evictions"]) for n, s in caches.items()], type="counter"),
+        Snapshot("ube_cache_stale_hits_total", "Valores vencidos servidos porque el origen falló",
+                 [({"cache": n}, s["stale_hits"]) for n, s in caches.items() if "stale_hits" in s], type="counter"),
+        Snapshot("ube_cache_size", "Entradas por caché",
+                 [({"cache": n}, s["size"]) for n, s in caches.items()]),
+        Snapshot("ube_cache_hit_ratio", "Proporción de aciertos por caché",
+                 [({"cache": n}, s["hit_rate"]) for n, s in caches.items()]),
+        Snapshot("ube_intent_classifier_total", "Clasificaciones resueltas localmente o enviadas a Gemini",
+                 [({"result": "local"}, intent["hits"]), ({"result": "fallback"}, intent["fallbacks"])], type="counter"),
+        Snapshot("ube_auth_ube_verify_total", "Verificaciones de token contra la API UBE realizadas y evitadas",
+                 [({"result": "called"}, auth.get("ube_verify_calls", 0)),
+                  ({"result": "avoided"}, auth.get("ube_verify_avoided", 0))], type="counter"),
+        Snapshot("ube_agents_built", "Agentes construidos en el registro", [({}, agent_registry.get_size())]),
+        Snapshot("ube_memory_chats", "Chats con memoria en este worker", [({}, memoria["chats"])] if memoria["chats"] is not None else []),
+    ]
+    if "resident_bytes" in memoria:
+        metricas += [
+            Snapshot("ube_memory_resident_bytes", "Bytes residentes de la memoria de conversación",
+                     [({}, memoria["resident_bytes"])]),
+            Snapshot("ube_memory_evictions_total", "Memorias desalojadas por límite de chats o bytes",
+                     [({}, memoria["evictions"])], type="counter"),
+            Snapshot("ube_memory_expirations_total", "Memorias eliminadas por inactividad",
+                     [({}, memoria["expirations"])], type="counter"),
+        ]
+    return metricas
+
+
+class MetricsView(View):
+    """
+    Métricas del worker en formato Prometheus. Exige
+    `Authorization: Bearer <METRICS_TOKEN>`; sin token configurado responde
+    404, salvo que `METRICS_PUBLIC` lo exponga explícitamente.
+    """
+
+    def get(self, request):
+        token = getattr(settings, "METRICS_TOKEN", None)
+        if not token:
+            if not getattr(settings, "METRICS_PUBLIC", False):
+                return HttpResponse(status=404)
+        else:
+            recibido = request.headers.get("Authorization", "")
+            # Comparación en tiempo constante
+            if not hmac.compare_digest(recibido.encode(), f"Bearer {token}".encode()):
+                return HttpResponse(status=401)
+        return HttpResponse(registry.render(extra=estadisticas()), content_type=CONTENT_TYPE)